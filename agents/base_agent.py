@@ -1,10 +1,9 @@
 import os
 from typing import List, Dict, Any, Optional, Callable
-from openai import OpenAI
-from anthropic import Anthropic
 from abc import ABC, abstractmethod
 import uuid
 import config
+from utils import get_llm_client
 import json
 from datetime import datetime
 
@@ -14,6 +13,8 @@ class BaseAgent(ABC):
 
     # Class variable for LLM log file path
     _llm_log_file = "logs/llm_calls.log"
+    # Size of the LLM log, read from disk once and then tracked from our writes
+    _llm_log_size: Optional[int] = None
 
     def __init__(
         self,
@@ -37,7 +38,9 @@ class BaseAgent(ABC):
             config_dict: Pre-loaded config dictionary (if not provided, will load from config.yaml)
         """
         self.agent_id = agent_id or str(uuid.uuid4())
-        self.agent_name = agent_name or self.__class__.__name__
+        # Class name, sent as agent_type with every UI update
+        self.agent_type = self.__class__.__name__
+        self.agent_name = agent_name or self.agent_type
 
         # Load config if agent_name is provided
         if agent_name:
@@ -59,11 +62,11 @@ class BaseAgent(ABC):
 
         self.websocket_callback = websocket_callback
 
-        # Initialize appropriate client based on API provider
-        if self.api_provider == "anthropic":
-            self.client = Anthropic(api_key=self.api_key)
-        else:
-            self.client = OpenAI(api_key=self.api_key, base_url=self.base_url)
+        # Serialized log entries waiting to be written in one batch
+        self._pending_log_entries: List[str] = []
+
+        # Get the shared client for this API provider and credentials
+        self.client = get_llm_client(self.api_provider, self.api_key, self.base_url)
 
     @abstractmethod
     def get_system_prompt(self) -> str:
@@ -81,7 +84,7 @@ class BaseAgent(ABC):
             self.websocket_callback({
                 "type": event_type,
                 "agent_id": self.agent_id,
-                "agent_type": self.__class__.__name__,
+                "agent_type": self.agent_type,
                 "data": data
             })
 
@@ -109,8 +112,12 @@ class BaseAgent(ABC):
             elided_messages.append(msg_copy)
         return elided_messages
 
-    def _log_llm_call(self, log_data: Dict[str, Any]):
-        """Log LLM call to file with rotation"""
+    def _log_llm_call(self, log_data: Dict[str, Any], flush: bool = True):
+        """Log LLM call to file with rotation
+
+        Entries logged with flush=False are buffered and written together with
+        the next flushed entry, so one LLM call costs a single file write.
+        """
         try:
             log_entry = {
                 "timestamp": datetime.now().isoformat(),
@@ -118,37 +125,69 @@ class BaseAgent(ABC):
                 "agent_name": self.agent_name,
                 **log_data
             }
-
-            # Ensure logs directory exists
-            log_dir = os.path.dirname(self._llm_log_file)
-            if log_dir and not os.path.exists(log_dir):
-                os.makedirs(log_dir, exist_ok=True)
-
-            # Rotate log file if it exists and is larger than 10MB
-            if os.path.exists(self._llm_log_file):
-                file_size = os.path.getsize(self._llm_log_file)
-                if file_size > 10 * 1024 * 1024:  # 10MB
-                    # Rotate old logs
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    rotated_name = f"{self._llm_log_file}.{timestamp}"
-                    os.rename(self._llm_log_file, rotated_name)
-
-                    # Keep only the last 5 rotated logs
-                    log_files = sorted([
-                        f for f in os.listdir(log_dir)
-                        if f.startswith(os.path.basename(self._llm_log_file) + ".")
-                    ])
-                    if len(log_files) > 5:
-                        for old_log in log_files[:-5]:
-                            os.remove(os.path.join(log_dir, old_log))
-
-            with open(self._llm_log_file, 'a') as f:
-                f.write(json.dumps(log_entry, indent=2))
-                f.write("\n" + "="*80 + "\n")
+            self._pending_log_entries.append(json.dumps(log_entry, indent=2) + "\n" + "="*80 + "\n")
+            if not flush:
+                return
+
+            # First write of the process: ensure the logs directory exists and
+            # pick up the size of any existing log
+            if BaseAgent._llm_log_size is None:
+                self._sync_llm_log()
+
+            # Rotate log file if it is larger than 10MB
+            if BaseAgent._llm_log_size > 10 * 1024 * 1024:  # 10MB
+                try:
+                    self._rotate_llm_log()
+                except OSError:
+                    # The log was removed or moved while we were running;
+                    # re-read it from disk and retry once
+                    self._sync_llm_log()
+                    if BaseAgent._llm_log_size > 10 * 1024 * 1024:
+                        self._rotate_llm_log()
+
+            # Entries are ASCII (json.dumps escapes the rest), so len() is the byte count
+            data = "".join(self._pending_log_entries)
+            try:
+                self._append_llm_log(data)
+            except OSError:
+                # The logs directory may have been deleted; recreate it and retry once
+                self._sync_llm_log()
+                self._append_llm_log(data)
+            BaseAgent._llm_log_size += len(data)
+            self._pending_log_entries.clear()
         except Exception as e:
             # Silently fail to avoid disrupting agent operation
+            self._pending_log_entries.clear()
             print(f"Warning: Failed to log LLM call: {e}")
 
+    def _sync_llm_log(self):
+        """Create the logs directory if needed and re-read the log size from disk"""
+        log_dir = os.path.dirname(self._llm_log_file)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+        BaseAgent._llm_log_size = os.path.getsize(self._llm_log_file) if os.path.exists(self._llm_log_file) else 0
+
+    def _rotate_llm_log(self):
+        """Move the LLM log aside and keep only the last 5 rotated logs"""
+        log_dir = os.path.dirname(self._llm_log_file)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        rotated_name = f"{self._llm_log_file}.{timestamp}"
+        os.rename(self._llm_log_file, rotated_name)
+        BaseAgent._llm_log_size = 0
+
+        log_files = sorted([
+            f for f in os.listdir(log_dir)
+            if f.startswith(os.path.basename(self._llm_log_file) + ".")
+        ])
+        if len(log_files) > 5:
+            for old_log in log_files[:-5]:
+                os.remove(os.path.join(log_dir, old_log))
+
+    def _append_llm_log(self, data: str):
+        """Append data to the LLM log file"""
+        with open(self._llm_log_file, 'a') as f:
+            f.write(data)
+
     def _convert_to_anthropic_format(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Convert OpenAI-style messages to Anthropic format"""
         anthropic_messages = []
@@ -218,18 +257,21 @@ class BaseAgent(ABC):
         if system and self.api_provider != "anthropic":
             llm_messages.insert(0, {"role": "system", "content": system})
 
-        # Log input
+        # Image data is elided once for both the log and the UI
+        elided_messages = self._elide_image_data(llm_messages)
+
+        # Log input (buffered until the output is logged)
         self._log_llm_call({
             "event": "input",
             "model": self.model,
             "temperature": temperature,
             "max_tokens": max_tokens,
-            "messages": self._elide_image_data(llm_messages)
-        })
+            "messages": elided_messages
+        }, flush=False)
 
         # Send start event with elided image data
         self.send_llm_update("llm_call_start", {
-            "messages": self._elide_image_data(llm_messages),
+            "messages": elided_messages,
             "model": self.model,
             "temperature": temperature,
             "max_tokens": max_tokens
@@ -238,73 +280,81 @@ class BaseAgent(ABC):
         response_text = ""
         reasoning_text = ""
 
-        if self.api_provider == "anthropic":
-            # Use Anthropic SDK
-            anthropic_messages = self._convert_to_anthropic_format(llm_messages)
-
-            if stream:
-                with self.client.messages.stream(
-                    model=self.model,
-                    messages=anthropic_messages,
-                    system=system or "",
-                    temperature=temperature,
-                    max_tokens=max_tokens
-                ) as response:
-                    for text in response.text_stream:
-                        response_text += text
-                        self.send_llm_update("llm_content_chunk", {
-                            "content": text
-                        })
-            else:
-                response = self.client.messages.create(
-                    model=self.model,
-                    messages=anthropic_messages,
-                    system=system or "",
-                    temperature=temperature,
-                    max_tokens=max_tokens
-                )
-                response_text = response.content[0].text
-        else:
-            # Use OpenAI SDK
-            if stream:
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=llm_messages,
-                    temperature=temperature,
-                    max_tokens=max_tokens,
-                    stream=True
-                )
-
-                for chunk in response:
-                    # Skip empty chunks
-                    if not chunk.choices:
-                        continue
-
-                    # Handle reasoning content
-                    if hasattr(chunk.choices[0].delta, 'model_extra') and chunk.choices[0].delta.model_extra:
-                        reasoning_content = chunk.choices[0].delta.model_extra.get('reasoning_content')
-                        if reasoning_content:
-                            reasoning_text += reasoning_content
-                            self.send_llm_update("llm_reasoning_chunk", {
-                                "content": reasoning_content
+        try:
+            if self.api_provider == "anthropic":
+                # Use Anthropic SDK
+                anthropic_messages = self._convert_to_anthropic_format(llm_messages)
+
+                if stream:
+                    with self.client.messages.stream(
+                        model=self.model,
+                        messages=anthropic_messages,
+                        system=system or "",
+                        temperature=temperature,
+                        max_tokens=max_tokens
+                    ) as response:
+                        for text in response.text_stream:
+                            response_text += text
+                            self.send_llm_update("llm_content_chunk", {
+                                "content": text
                             })
-
-                    # Handle regular content
-                    if chunk.choices[0].delta.content:
-                        content = chunk.choices[0].delta.content
-                        response_text += content
-                        self.send_llm_update("llm_content_chunk", {
-                            "content": content
-                        })
+                else:
+                    response = self.client.messages.create(
+                        model=self.model,
+                        messages=anthropic_messages,
+                        system=system or "",
+                        temperature=temperature,
+                        max_tokens=max_tokens
+                    )
+                    response_text = response.content[0].text
             else:
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=llm_messages,
-                    temperature=temperature,
-                    max_tokens=max_tokens,
-                    stream=False
-                )
-                response_text = response.choices[0].message.content
+                # Use OpenAI SDK
+                if stream:
+                    response = self.client.chat.completions.create(
+                        model=self.model,
+                        messages=llm_messages,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        stream=True
+                    )
+
+                    for chunk in response:
+                        # Skip empty chunks
+                        if not chunk.choices:
+                            continue
+
+                        # Handle reasoning content
+                        if hasattr(chunk.choices[0].delta, 'model_extra') and chunk.choices[0].delta.model_extra:
+                            reasoning_content = chunk.choices[0].delta.model_extra.get('reasoning_content')
+                            if reasoning_content:
+                                reasoning_text += reasoning_content
+                                self.send_llm_update("llm_reasoning_chunk", {
+                                    "content": reasoning_content
+                                })
+
+                        # Handle regular content
+                        if chunk.choices[0].delta.content:
+                            content = chunk.choices[0].delta.content
+                            response_text += content
+                            self.send_llm_update("llm_content_chunk", {
+                                "content": content
+                            })
+                else:
+                    response = self.client.chat.completions.create(
+                        model=self.model,
+                        messages=llm_messages,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        stream=False
+                    )
+                    response_text = response.choices[0].message.content
+        except Exception as e:
+            # Flush the buffered input entry together with the failure
+            self._log_llm_call({
+                "event": "error",
+                "error": str(e)
+            })
+            raise
 
         # Log output
         self._log_llm_call({
@@ -1,13 +1,7 @@
-import base64
 import json
 from typing import List, Dict, Any, Optional, Callable
-import subprocess
-import tempfile
-import os
-from PIL import Image
-from io import BytesIO
 from agents.base_agent import BaseAgent
-from utils import strip_json_code_blocks, compact_context, count_words, save_screenshot
+from utils import parse_json_response, compact_context, count_words, save_screenshot_in_background, capture_screenshot_base64_async
 
 
 class BossAgent(BaseAgent):
@@ -34,6 +28,9 @@ class BossAgent(BaseAgent):
         self.response_history: List[Dict[str, Any]] = []
         self.compacted_context: str = ""
         self.step_count: int = 0
+        # Agent responses already recorded for the message being processed
+        self._tracked_message: Optional[Dict[str, Any]] = None
+        self._recorded_responses: int = 0
 
     def get_system_prompt(self) -> str:
         """Get the system prompt for the boss agent"""
@@ -123,46 +120,9 @@ Your response must be ONLY a JSON object with no additional text:
 - ✗ WRONG: Here's what I'll do: {"thought": "...", "action": {...}}
 """
 
-    def get_screenshot_base64(self) -> str:
-        """Capture screenshot and return as base64-encoded JPEG using scrot"""
-        # Create temp file and close it immediately so scrot can write to it
-        temp_fd, temp_path = tempfile.mkstemp(suffix='.png')
-        os.close(temp_fd)  # Close the file descriptor immediately
-
-        # Remove the empty file that mkstemp created
-        if os.path.exists(temp_path):
-            os.unlink(temp_path)
-
-        try:
-            # Capture with scrot (ensure DISPLAY is set)
-            env = os.environ.copy()
-            if 'DISPLAY' not in env:
-                env['DISPLAY'] = ':0'
-
-            result = subprocess.run(
-                ["scrot", temp_path],
-                capture_output=True,
-                timeout=2,
-                env=env
-            )
-
-            if result.returncode != 0:
-                raise RuntimeError(f"scrot failed with code {result.returncode}: stdout={result.stdout.decode()}, stderr={result.stderr.decode()}")
-
-            if not os.path.exists(temp_path) or os.path.getsize(temp_path) == 0:
-                raise RuntimeError(f"scrot did not create screenshot file at {temp_path}. Return code: {result.returncode}, stdout={result.stdout.decode()}, stderr={result.stderr.decode()}")
-
-            # Load and convert to JPEG
-            screenshot = Image.open(temp_path)
-            buffer = BytesIO()
-            screenshot.save(buffer, format="JPEG", quality=75)
-            buffer.seek(0)
-            img_base64 = base64.b64encode(buffer.read()).decode('utf-8')
-            return f"data:image/jpeg;base64,{img_base64}"
-        finally:
-            # Clean up temp file
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
+    async def get_screenshot_base64(self) -> str:
+        """Capture screenshot and return as base64-encoded JPEG"""
+        return await capture_screenshot_base64_async(':0')
 
     async def process_message(self, message: Dict[str, Any]) -> Dict[str, Any]:
         """Process a message and return a response"""
@@ -176,15 +136,24 @@ Your response must be ONLY a JSON object with no additional text:
             trigger_words = compaction_config.get('trigger', {}).get('words', 1000)
 
             # Get current screenshot
-            screenshot = self.get_screenshot_base64()
+            screenshot = await self.get_screenshot_base64()
+
+            # Save screenshot to disk without blocking the event loop
+            save_screenshot_in_background(screenshot, "boss")
 
-            # Save screenshot to disk
-            save_screenshot(screenshot, prefix="boss")
+            # Only record agent responses that arrived since the previous step;
+            # older ones are already in history or in the compacted context
+            agent_responses = message.get('agent_responses', [])
+            if message is not self._tracked_message:
+                self._tracked_message = message
+                self._recorded_responses = 0
+            new_responses = agent_responses[self._recorded_responses:]
+            self._recorded_responses = len(agent_responses)
 
             # Store current response in history
             current_response = {
                 "user_request": message.get('content', ''),
-                "agent_responses": message.get('agent_responses', [])
+                "agent_responses": new_responses
             }
             self.response_history.append(current_response)
 
@@ -232,7 +201,7 @@ Your response must be ONLY a JSON object with no additional text:
                             response = agent_resp.get("response", {})
                             context_parts.append(f"Step {idx} - {agent_type} response: {response}\n\n")
 
-            context_parts.append(f"Current Agent Responses: {message.get('agent_responses', [])}")
+            context_parts.append(f"Current Agent Responses: {new_responses}")
 
             # Build messages for LLM
             messages = [
@@ -266,8 +235,7 @@ Your response must be ONLY a JSON object with no additional text:
 
             # Parse response
             try:
-                cleaned_response = strip_json_code_blocks(response)
-                response_data = json.loads(cleaned_response)
+                response_data = parse_json_response(response)
             except json.JSONDecodeError:
                 # If not valid JSON, treat as a thought/response
                 response_data = {
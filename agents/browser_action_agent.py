@@ -4,7 +4,10 @@ import base64
 from typing import Dict, Any, Optional, Callable, List
 from playwright.async_api import async_playwright, Browser, BrowserContext, Page
 from agents.base_agent import BaseAgent
-from utils import strip_json_code_blocks, save_screenshot, compact_context, count_words
+from utils import strip_json_code_blocks, parse_json_response, save_screenshot, compact_context, count_words
+
+# Tools whose handlers take no arguments (any args from the LLM are ignored)
+NO_ARG_TOOLS = frozenset({"screenshot", "close"})
 
 
 class BrowserActionAgent(BaseAgent):
@@ -35,6 +38,26 @@ class BrowserActionAgent(BaseAgent):
         self.compacted_context: str = ""
         self.step_count: int = 0
 
+        # Tool name -> handler used by execute_action
+        self.tools: Dict[str, Callable] = {
+            "launch": self._launch,
+            "navigate": self._navigate,
+            "click": self._click,
+            "input_text": self._input_text,
+            "fill": self._fill,
+            "focus": self._focus,
+            "press_key": self._press_key,
+            "hover": self._hover,
+            "get_text": self._get_text,
+            "get_value": self._get_value,
+            "wait_for_element": self._wait_for_element,
+            "scroll_into_view": self._scroll_into_view,
+            "screenshot": self._screenshot,
+            "close": self._close,
+            "wait": self._wait,
+            "exit": self._exit,
+        }
+
     def get_system_prompt(self) -> str:
         """Get the system prompt for the browser action agent"""
         return """# Identity
@@ -104,15 +127,28 @@ When the task is complete, respond with:
         return self.page
 
     async def _launch(self, name: str = "chromium") -> Dict[str, Any]:
-        """Launch a new browser"""
+        """Launch a new browser, or reuse the one already running"""
         try:
+            if name != "firefox":
+                name = "chromium"
+
+            # Reuse a running browser of the same type instead of starting another
+            if self.browser and self.browser.is_connected():
+                if self.browser.browser_type.name == name:
+                    if self.page is None or self.page.is_closed():
+                        self.page = await self.context.new_page()
+                    return {
+                        "success": True,
+                        "message": f"{name.capitalize()} browser already running"
+                    }
+                await self.browser.close()
+
             if self.playwright is None:
                 self.playwright = await async_playwright().start()
 
             if name == "firefox":
                 self.browser = await self.playwright.firefox.launch(headless=False)
             else:
-                name = "chromium"
                 # Add Chrome args to fix SIGTRAP in Docker
                 self.browser = await self.playwright.chromium.launch(
                     headless=False,
@@ -478,7 +514,9 @@ When the task is complete, respond with:
             screenshot_b64 = base64.b64encode(screenshot_bytes).decode('utf-8')
             screenshot_data = f"data:image/png;base64,{screenshot_b64}"
 
-            filepath = save_screenshot(screenshot_data, prefix="browser")
+            filepath = await asyncio.get_running_loop().run_in_executor(
+                None, save_screenshot, screenshot_data, "browser"
+            )
 
             return {
                 "success": True,
@@ -546,44 +584,20 @@ When the task is complete, respond with:
         tool = action.get("tool")
         args = action.get("args", {})
 
+        handler = self.tools.get(tool)
+
         try:
-            if tool == "launch":
-                return await self._launch(**args)
-            elif tool == "navigate":
-                return await self._navigate(**args)
-            elif tool == "click":
-                return await self._click(**args)
-            elif tool == "input_text":
-                return await self._input_text(**args)
-            elif tool == "fill":
-                return await self._fill(**args)
-            elif tool == "focus":
-                return await self._focus(**args)
-            elif tool == "press_key":
-                return await self._press_key(**args)
-            elif tool == "hover":
-                return await self._hover(**args)
-            elif tool == "get_text":
-                return await self._get_text(**args)
-            elif tool == "get_value":
-                return await self._get_value(**args)
-            elif tool == "wait_for_element":
-                return await self._wait_for_element(**args)
-            elif tool == "scroll_into_view":
-                return await self._scroll_into_view(**args)
-            elif tool == "screenshot":
-                return await self._screenshot()
-            elif tool == "close":
-                return await self._close()
-            elif tool == "wait":
-                return await self._wait(**args)
-            elif tool == "exit":
-                return self._exit(**args)
-            else:
+            if handler is None:
                 return {
                     "success": False,
                     "error": f"Unknown tool: {tool}"
                 }
+
+            result = handler() if tool in NO_ARG_TOOLS else handler(**args)
+            # Every handler except exit is a coroutine
+            if asyncio.iscoroutine(result):
+                result = await result
+            return result
         except Exception as e:
             return {
                 "success": False,
@@ -592,140 +606,134 @@ When the task is complete, respond with:
 
     async def process_message(self, message: Dict[str, Any]) -> Dict[str, Any]:
         """Async version of process_message"""
-        try:
-            task = message.get("content", "")
-            max_iterations = message.get("max_iterations", 20)
-            iteration = 0
+        task = message.get("content", "")
+        max_iterations = message.get("max_iterations", 20)
+        iteration = 0
 
+        # One handler covers every iteration; it reports where the loop stopped
+        try:
             while iteration < max_iterations:
                 iteration += 1
                 self.step_count += 1
 
-                try:
-                    # Get compaction config
-                    compaction_config = self.config_dict.get('compaction', {}) if self.config_dict else {}
-                    trigger_steps = compaction_config.get('trigger', {}).get('steps', 5)
-                    trigger_words = compaction_config.get('trigger', {}).get('words', 1000)
-
-                    # Check if compaction is needed
-                    context_text = str(self.history)
-                    word_count = count_words(context_text)
-
-                    if self.step_count >= trigger_steps or word_count >= trigger_words:
-                        self.compacted_context = compact_context(
-                            self.history,
-                            task,
-                            self.config_dict,
-                            self.websocket_callback,
-                            self.agent_id,
-                            self.agent_name
-                        )
-                        self.history = []
-                        self.step_count = 0
-
-                    # Build context for LLM
-                    context_parts = [f"# Task\n\n{task}"]
-
-                    if self.compacted_context:
-                        context_parts.append(f"\n# Previous Actions (compacted)\n{self.compacted_context}")
-
-                    if self.history:
-                        context_parts.append("\n# Action History")
-                        for i, item in enumerate(self.history[-10:], 1):
-                            context_parts.append(f"\n{i}. Action: {item['action']}")
-                            context_parts.append(f"   Result: {item['result']}")
-
-                    messages = [
-                        {
-                            "role": "user",
-                            "content": "\n".join(context_parts)
-                        }
-                    ]
-
-                    # Generate next action
-                    response = self.call_llm(
-                        messages=messages,
-                        system=self.get_system_prompt()
+                # Get compaction config
+                compaction_config = self.config_dict.get('compaction', {}) if self.config_dict else {}
+                trigger_steps = compaction_config.get('trigger', {}).get('steps', 5)
+                trigger_words = compaction_config.get('trigger', {}).get('words', 1000)
+
+                # Check if compaction is needed
+                context_text = str(self.history)
+                word_count = count_words(context_text)
+
+                if self.step_count >= trigger_steps or word_count >= trigger_words:
+                    self.compacted_context = compact_context(
+                        self.history,
+                        task,
+                        self.config_dict,
+                        self.websocket_callback,
+                        self.agent_id,
+                        self.agent_name
                     )
+                    self.history = []
+                    self.step_count = 0
 
-                    # Parse response
+                # Build context for LLM
+                context_parts = [f"# Task\n\n{task}"]
+
+                if self.compacted_context:
+                    context_parts.append(f"\n# Previous Actions (compacted)\n{self.compacted_context}")
+
+                if self.history:
+                    context_parts.append("\n# Action History")
+                    for i, item in enumerate(self.history[-10:], 1):
+                        context_parts.append(f"\n{i}. Action: {item['action']}")
+                        context_parts.append(f"   Result: {item['result']}")
+
+                messages = [
+                    {
+                        "role": "user",
+                        "content": "\n".join(context_parts)
+                    }
+                ]
+
+                # Generate next action
+                response = self.call_llm(
+                    messages=messages,
+                    system=self.get_system_prompt()
+                )
+
+                # Parse response
+                try:
+                    response_data = parse_json_response(response)
+                except json.JSONDecodeError:
+                    # Try fixing common issues (unescaped newlines in strings)
                     try:
-                        cleaned_response = strip_json_code_blocks(response)
-                        response_data = json.loads(cleaned_response)
+                        # Replace literal newlines with escaped newlines
+                        fixed_response = strip_json_code_blocks(response).replace('\n', '\\n')
+                        response_data = json.loads(fixed_response)
                     except json.JSONDecodeError:
-                        # Try fixing common issues (unescaped newlines in strings)
-                        try:
-                            # Replace literal newlines with escaped newlines
-                            fixed_response = cleaned_response.replace('\n', '\\n')
-                            response_data = json.loads(fixed_response)
-                        except json.JSONDecodeError:
-                            print(f"ERROR: BrowserActionAgent received invalid JSON response: {response}")
-                            return {
-                                "success": False,
-                                "error": "Invalid response format",
-                                "iterations": iteration,
-                                "history": self.history
-                            }
-
-                    # Send thought update
-                    self.send_llm_update("thought", {
-                        "thought": response_data.get("thought", ""),
-                        "iteration": iteration
-                    })
-
-                    # Execute action
-                    action = response_data.get("action")
-                    if not action:
+                        print(f"ERROR: BrowserActionAgent received invalid JSON response: {response}")
                         return {
                             "success": False,
-                            "error": "No action provided",
+                            "error": "Invalid response format",
                             "iterations": iteration,
                             "history": self.history
                         }
 
-                    # Send action execute update
-                    self.send_llm_update("action_execute", {
-                        "action": action,
-                        "iteration": iteration
-                    })
-
-                    # Execute action
-                    exec_result = await self.execute_action(action)
-
-                    # Send execution result
-                    self.send_llm_update("action_result", {
-                        "result": exec_result
-                    })
-
-                    # Add to history
-                    self.history.append({
-                        "action": action,
-                        "result": exec_result,
-                        "thought": response_data.get("thought", "")
-                    })
-
-                    # Check if exit action
-                    if exec_result.get("exit", False):
-                        # Don't close browser - keep it open for subsequent tasks
-                        # Browser will be kept alive across multiple delegations from BrowserBossAgent
-                        summary = exec_result.get("summary", exec_result.get("message", "Task completed"))
-                        return {
-                            "success": True,
-                            "exit": True,
-                            "summary": summary,
-                            "message": summary,  # For backwards compatibility
-                            "result": summary,
-                            "iterations": iteration,
-                            "history": self.history
-                        }
+                # Send thought update
+                self.send_llm_update("thought", {
+                    "thought": response_data.get("thought", ""),
+                    "iteration": iteration
+                })
 
-                except Exception as e:
-                    print(f"ERROR: BrowserActionAgent iteration {iteration} failed: {e}")
-                    import traceback
-                    traceback.print_exc()
+                # Execute action
+                action = response_data.get("action")
+                if not action:
                     return {
                         "success": False,
-                        "error": f"Error in iteration {iteration}: {str(e)}",
+                        "error": "No action provided",
+                        "iterations": iteration,
+                        "history": self.history
+                    }
+
+                # Send action execute update
+                self.send_llm_update("action_execute", {
+                    "action": action,
+                    "iteration": iteration
+                })
+
+                # Execute action
+                exec_result = await self.execute_action(action)
+
+                # Screenshots are already saved to disk; keep only their
+                # filepath so the image data is not copied into every
+                # update, prompt and returned history
+                if "screenshot" in exec_result:
+                    exec_result = {k: v for k, v in exec_result.items() if k != "screenshot"}
+
+                # Send execution result
+                self.send_llm_update("action_result", {
+                    "result": exec_result
+                })
+
+                # Add to history
+                self.history.append({
+                    "action": action,
+                    "result": exec_result,
+                    "thought": response_data.get("thought", "")
+                })
+
+                # Check if exit action
+                if exec_result.get("exit", False):
+                    # Don't close browser - keep it open for subsequent tasks
+                    # Browser will be kept alive across multiple delegations from BrowserBossAgent
+                    summary = exec_result.get("summary", exec_result.get("message", "Task completed"))
+                    return {
+                        "success": True,
+                        "exit": True,
+                        "summary": summary,
+                        "message": summary,  # For backwards compatibility
+                        "result": summary,
                         "iterations": iteration,
                         "history": self.history
                     }
@@ -739,14 +747,14 @@ When the task is complete, respond with:
             }
 
         except Exception as e:
-            print(f"ERROR: BrowserActionAgent failed to process message: {e}")
+            print(f"ERROR: BrowserActionAgent iteration {iteration} failed: {e}")
             import traceback
             traceback.print_exc()
 
             # Don't close browser on error - keep it open for subsequent tasks
             return {
                 "success": False,
-                "error": str(e),
-                "iterations": 0,
+                "error": f"Error in iteration {iteration}: {str(e)}",
+                "iterations": iteration,
                 "history": self.history
             }
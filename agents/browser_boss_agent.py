@@ -1,14 +1,8 @@
 import json
-import base64
-import subprocess
-import tempfile
-import os
-from PIL import Image
-from io import BytesIO
 from typing import List, Dict, Any, Optional, Callable
 from datetime import datetime
 from agents.base_agent import BaseAgent
-from utils import strip_json_code_blocks, compact_context, count_words, save_screenshot
+from utils import parse_json_response, compact_context, count_words, save_screenshot_in_background, capture_screenshot_base64_async
 
 
 class BrowserBossAgent(BaseAgent):
@@ -48,46 +42,9 @@ class BrowserBossAgent(BaseAgent):
         except Exception as e:
             print(f"Error logging summary: {e}")
 
-    def get_screenshot_base64(self) -> str:
-        """Capture screenshot of entire screen and return as base64-encoded JPEG using scrot"""
-        # Create temp file and close it immediately so scrot can write to it
-        temp_fd, temp_path = tempfile.mkstemp(suffix='.png')
-        os.close(temp_fd)  # Close the file descriptor immediately
-
-        # Remove the empty file that mkstemp created
-        if os.path.exists(temp_path):
-            os.unlink(temp_path)
-
-        try:
-            # Capture with scrot (ensure DISPLAY is set)
-            env = os.environ.copy()
-            if 'DISPLAY' not in env:
-                env['DISPLAY'] = ':1'
-
-            result = subprocess.run(
-                ["scrot", temp_path],
-                capture_output=True,
-                timeout=2,
-                env=env
-            )
-
-            if result.returncode != 0:
-                raise RuntimeError(f"scrot failed with code {result.returncode}")
-
-            if not os.path.exists(temp_path) or os.path.getsize(temp_path) == 0:
-                raise RuntimeError(f"scrot did not create screenshot file at {temp_path}")
-
-            # Load and convert to JPEG
-            screenshot = Image.open(temp_path)
-            buffer = BytesIO()
-            screenshot.save(buffer, format="JPEG", quality=75)
-            buffer.seek(0)
-            img_base64 = base64.b64encode(buffer.read()).decode('utf-8')
-            return f"data:image/jpeg;base64,{img_base64}"
-        finally:
-            # Clean up temp file
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
+    async def get_screenshot_base64(self) -> str:
+        """Capture screenshot of entire screen and return as base64-encoded JPEG"""
+        return await capture_screenshot_base64_async(':1')
 
     def get_system_prompt(self) -> str:
         """Get the system prompt for the browser boss agent"""
@@ -179,7 +136,7 @@ Your response must be ONLY a JSON object with no additional text:
                                 "agent_type": "XPathAgent",
                                 "response": {
                                     "success": True,
-                                    "xpath": line.split("xpath='")[1].split("'")[0] if "xpath='" in line else ""
+                                    "xpath": line.partition("xpath='")[2].partition("'")[0]
                                 }
                             })
 
@@ -187,6 +144,7 @@ Your response must be ONLY a JSON object with no additional text:
                 "content": task,
                 "agent_responses": initial_agent_responses
             }
+            recorded_responses = 0
 
             while iteration < max_iterations:
                 iteration += 1
@@ -195,21 +153,24 @@ Your response must be ONLY a JSON object with no additional text:
                 self.step_count += 1
 
                 # Get screenshot of entire screen
-                screenshot = self.get_screenshot_base64()
+                screenshot = await self.get_screenshot_base64()
 
-                # Save screenshot
-                save_screenshot(screenshot, prefix="browser_boss")
+                # Save screenshot without blocking the event loop
+                save_screenshot_in_background(screenshot, "browser_boss")
 
                 # Get compaction config
                 compaction_config = self.config_dict.get('compaction', {}) if self.config_dict else {}
                 trigger_steps = compaction_config.get('trigger', {}).get('steps', 5)
                 trigger_words = compaction_config.get('trigger', {}).get('words', 1000)
 
-                # Store current response in history
+                # Store current response in history, recording only the agent
+                # responses added since the previous iteration
+                agent_responses = internal_message.get('agent_responses', [])
                 current_response = {
                     "user_request": internal_message.get('content', ''),
-                    "agent_responses": internal_message.get('agent_responses', [])
+                    "agent_responses": agent_responses[recorded_responses:]
                 }
+                recorded_responses = len(agent_responses)
                 self.response_history.append(current_response)
 
                 # Check if compaction is needed
@@ -238,7 +199,6 @@ Your response must be ONLY a JSON object with no additional text:
                 context_parts.append(f"User Request: {internal_message.get('content', '')}\n")
 
                 # Extract useful information from agent responses (only show last few to avoid clutter)
-                agent_responses = internal_message.get('agent_responses', [])
                 if agent_responses:
                     context_parts.append("\nRecent Agent Results (DO NOT REQUEST SAME INFORMATION AGAIN):\n")
                     # Show only the most recent 5 results to avoid context overflow
@@ -306,8 +266,7 @@ Your response must be ONLY a JSON object with no additional text:
 
                 # Parse response
                 try:
-                    cleaned_response = strip_json_code_blocks(response)
-                    response_data = json.loads(cleaned_response)
+                    response_data = parse_json_response(response)
                 except json.JSONDecodeError:
                     # If not valid JSON, treat as a thought/response
                     response_data = {
@@ -328,16 +287,19 @@ Your response must be ONLY a JSON object with no additional text:
                     # Build comprehensive summary including any found XPaths for future reference
                     comprehensive_summary = summary
                     found_xpaths = []
+                    seen_xpaths = set()
                     for resp in internal_message.get("agent_responses", []):
                         if resp.get("agent_type") == "XPathAgent":
                             response = resp.get("response", {})
-                            if response.get("success") and response.get("xpath"):
-                                found_xpaths.append(response.get("xpath"))
+                            xpath = response.get("xpath")
+                            if response.get("success") and xpath and xpath not in seen_xpaths:
+                                seen_xpaths.add(xpath)
+                                found_xpaths.append(xpath)
 
                     if found_xpaths:
-                        comprehensive_summary += f"\n\nKnown XPaths:\n"
-                        for xpath in found_xpaths:
-                            comprehensive_summary += f"- xpath='{xpath}'\n"
+                        comprehensive_summary += "\n\nKnown XPaths:\n" + "".join(
+                            f"- xpath='{xpath}'\n" for xpath in found_xpaths
+                        )
 
                     # Log the summary
                     self.log_summary("BrowserBossAgent", comprehensive_summary)
@@ -1,15 +1,16 @@
+import asyncio
 import base64
 from typing import List, Dict, Any, Optional, Callable
 from io import BytesIO
 import subprocess
 import os
-import tempfile
-import time
+import re
+from functools import lru_cache
+from types import CodeType
 from PIL import Image, ImageDraw
-from openai import OpenAI
 from agents.base_agent import BaseAgent
 import tools
-from utils import compact_context, count_words, save_screenshot
+from utils import compact_context, count_words, save_screenshot_in_background, get_llm_client
 
 # Setup X11 authentication to avoid Xlib warnings
 try:
@@ -17,6 +18,49 @@ try:
 except ImportError:
     pass
 
+# First ```python block, else the first fenced block; an unclosed fence runs to the end
+_PYTHON_BLOCK_RE = re.compile(r"```python(.*?)(?:```|$)", re.DOTALL)
+_CODE_BLOCK_RE = re.compile(r"```(.*?)(?:```|$)", re.DOTALL)
+
+
+def _extract_code(text: str) -> str:
+    """Extract Python code from a markdown code block if present"""
+    match = _PYTHON_BLOCK_RE.search(text) or _CODE_BLOCK_RE.search(text)
+    return match.group(1).strip() if match else text
+
+
+@lru_cache(maxsize=64)
+def _compile_action(code: str) -> CodeType:
+    """Compile action code so each tools call stores its result in __action_result__
+
+    Agents repeat the same actions (waits, hotkeys, clicks on the same spot)
+    often, so the rewritten and compiled code is cached by source text.
+    """
+    # Parse the code to extract the tool call and capture its result
+    modified_lines = []
+    for line in code.split('\n'):
+        stripped = line.strip()
+        # If this is a tools call (not exit and not a comment), capture its result
+        if stripped.startswith('tools.') and not stripped.startswith('tools.exit('):
+            # Calculate indentation
+            indent = len(line) - len(line.lstrip())
+            modified_lines.append(' ' * indent + f'__action_result__ = {stripped}')
+        else:
+            modified_lines.append(line)
+
+    return compile('\n'.join(modified_lines), '<action>', 'exec')
+
+
+@lru_cache(maxsize=1)
+def _load_cursor_image() -> Optional[Image.Image]:
+    """Load and decode the cursor overlay once, or None if it is unavailable"""
+    try:
+        cursor_img = Image.open('./cursor.png')
+        cursor_img.load()
+        return cursor_img
+    except Exception:
+        return None
+
 
 class GUIAgent(BaseAgent):
     """GUI agent that handles mouse and keyboard actions"""
@@ -69,10 +113,7 @@ class GUIAgent(BaseAgent):
                     api_key = hf_config.get('api_key')
                     base_url = hf_config.get('base_url')
 
-                    self.action_gen_client = OpenAI(
-                        base_url=base_url,
-                        api_key=api_key
-                    )
+                    self.action_gen_client = get_llm_client("openai", api_key, base_url)
                     self.action_gen_model = action_gen_config.get('model')
                     self.action_gen_temperature = action_gen_config.get('temperature', 0.7)
                     self.action_gen_max_tokens = action_gen_config.get('max_tokens', 1000)
@@ -118,71 +159,59 @@ tools.click(0.5, 0.3)
 
     def get_screenshot_base64(self) -> str:
         """Capture screenshot and return as base64-encoded JPEG with cursor drawn"""
-        # Create temp file and close it immediately so import can write to it
-        temp_fd, temp_path = tempfile.mkstemp(suffix='.png')
-        os.close(temp_fd)  # Close the file descriptor immediately
-
-        # Remove the empty file that mkstemp created
-        if os.path.exists(temp_path):
-            os.unlink(temp_path)
+        # Set up environment
+        env = os.environ.copy()
+        if 'DISPLAY' not in env:
+            env['DISPLAY'] = ':0'
+
+        # Capture screenshot with import, streaming the PNG to stdout
+        # instead of going through a temp file
+        result = subprocess.run(
+            ["import", "-window", "root", "png:-"],
+            capture_output=True,
+            timeout=2,
+            env=env
+        )
 
-        try:
-            # Set up environment
-            env = os.environ.copy()
-            if 'DISPLAY' not in env:
-                env['DISPLAY'] = ':0'
+        if result.returncode != 0:
+            raise RuntimeError(f"import failed with code {result.returncode}: {result.stderr.decode()}")
 
-            # Capture screenshot with import
-            result = subprocess.run(
-                ["import", "-window", "root", temp_path],
-                capture_output=True,
-                timeout=2,
-                env=env
-            )
+        if not result.stdout:
+            raise RuntimeError("import did not output a screenshot")
 
-            if result.returncode != 0:
-                raise RuntimeError(f"import failed with code {result.returncode}: {result.stderr.decode()}")
+        # Get cursor position using Python Xlib
+        cursor_x, cursor_y = None, None
+        try:
+            import Xlib.display
+            display = Xlib.display.Display(env.get('DISPLAY', ':0'))
+            root = display.screen().root
+            pointer = root.query_pointer()
+            cursor_x = pointer.root_x
+            cursor_y = pointer.root_y
+            display.close()
+        except Exception as e:
+            # If Xlib fails, don't draw cursor
+            pass
 
-            if not os.path.exists(temp_path) or os.path.getsize(temp_path) == 0:
-                raise RuntimeError(f"import did not create screenshot file at {temp_path}")
+        # Load screenshot and overlay cursor
+        screenshot = Image.open(BytesIO(result.stdout))
 
-            # Get cursor position using Python Xlib
-            cursor_x, cursor_y = None, None
+        # Only overlay cursor if we successfully got the position
+        # (skip the overlay if the cursor image is not available)
+        cursor_img = _load_cursor_image()
+        if cursor_x is not None and cursor_y is not None and cursor_img is not None:
             try:
-                import Xlib.display
-                display = Xlib.display.Display(env.get('DISPLAY', ':0'))
-                root = display.screen().root
-                pointer = root.query_pointer()
-                cursor_x = pointer.root_x
-                cursor_y = pointer.root_y
-                display.close()
-            except Exception as e:
-                # If Xlib fails, don't draw cursor
+                # Paste cursor at the position (use alpha channel if available)
+                screenshot.paste(cursor_img, (cursor_x, cursor_y), cursor_img if cursor_img.mode == 'RGBA' else None)
+            except Exception:
                 pass
 
-            # Load screenshot and overlay cursor
-            screenshot = Image.open(temp_path)
-
-            # Only overlay cursor if we successfully got the position
-            if cursor_x is not None and cursor_y is not None:
-                try:
-                    cursor_img = Image.open('./cursor.png')
-                    # Paste cursor at the position (use alpha channel if available)
-                    screenshot.paste(cursor_img, (cursor_x, cursor_y), cursor_img if cursor_img.mode == 'RGBA' else None)
-                except Exception:
-                    # If cursor image not available, skip cursor overlay
-                    pass
-
-            # Convert to JPEG
-            buffer = BytesIO()
-            screenshot.save(buffer, format="JPEG", quality=75)
-            buffer.seek(0)
-            img_base64 = base64.b64encode(buffer.read()).decode('utf-8')
-            return f"data:image/jpeg;base64,{img_base64}"
-        finally:
-            # Clean up temp file
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
+        # Convert to JPEG
+        buffer = BytesIO()
+        screenshot.save(buffer, format="JPEG", quality=75)
+        # Encode straight from the buffer's memory instead of reading a copy
+        img_base64 = base64.b64encode(buffer.getbuffer()).decode('ascii')
+        return f"data:image/jpeg;base64,{img_base64}"
 
     def get_active_windows(self) -> str:
         """Get list of active windows"""
@@ -200,11 +229,7 @@ tools.click(0.5, 0.3)
     def execute_action(self, action_code: str) -> dict:
         """Execute the generated Python code"""
         # Extract the actual Python code
-        code = action_code
-        if "```python" in code:
-            code = code.split("```python")[1].split("```")[0].strip()
-        elif "```" in code:
-            code = code.split("```")[1].split("```")[0].strip()
+        code = _extract_code(action_code)
 
         # Execute the code and capture the result
         result = {"stdout": "", "stderr": "", "exitCode": 0}
@@ -213,24 +238,8 @@ tools.click(0.5, 0.3)
             # Create a namespace with tools available and a result holder
             namespace = {"tools": tools, "__action_result__": None}
 
-            # Parse the code to extract the tool call and capture its result
-            lines = code.split('\n')
-            modified_lines = []
-
-            for line in lines:
-                stripped = line.strip()
-                # If this is a tools call (not exit and not a comment), capture its result
-                if stripped.startswith('tools.') and not stripped.startswith('tools.exit('):
-                    # Calculate indentation
-                    indent = len(line) - len(line.lstrip())
-                    modified_lines.append(' ' * indent + f'__action_result__ = {stripped}')
-                else:
-                    modified_lines.append(line)
-
-            modified_code = '\n'.join(modified_lines)
-
             # Execute the modified code
-            exec(modified_code, namespace)
+            exec(_compile_action(code), namespace)
 
             # Extract result if available
             if namespace.get("__action_result__") is not None:
@@ -364,25 +373,13 @@ tools.click(0.5, 0.3)
             }
         ]
 
-        # Send LLM call start event for verification
-        self.send_llm_update("llm_call_start", {
-            "agent_type": "GUIAgent"
-        })
-
+        # call_llm already emits llm_call_start, content chunks and llm_call_end
         verification = self.call_llm(
             messages=messages,
             system="You are a verification assistant. Compare two screenshots (before and after an action) and determine if the action succeeded. Be concise.",
             max_tokens=500
         )
 
-        # Send content chunk for status animation
-        self.send_llm_update("llm_content_chunk", {
-            "content": verification[:100] + "..." if len(verification) > 100 else verification
-        })
-
-        # Send LLM call end event
-        self.send_llm_update("llm_call_end", {})
-
         return verification
 
     async def process_message(self, message: Dict[str, Any]) -> Dict[str, Any]:
@@ -420,12 +417,15 @@ tools.click(0.5, 0.3)
                 history = []
                 self.step_count = 0
 
-            # Get current screenshot
-            screenshot = self.get_screenshot_base64()
-            active_windows = self.get_active_windows()
+            # Get current screenshot and window list concurrently, off the event loop
+            loop = asyncio.get_running_loop()
+            screenshot, active_windows = await asyncio.gather(
+                loop.run_in_executor(None, self.get_screenshot_base64),
+                loop.run_in_executor(None, self.get_active_windows)
+            )
 
-            # Save screenshot to disk
-            save_screenshot(screenshot, prefix="gui")
+            # Save screenshot to disk without blocking the event loop
+            save_screenshot_in_background(screenshot, "gui")
 
             # Send screenshot update
             self.send_llm_update("screenshot", {
@@ -473,10 +473,7 @@ tools.click(0.5, 0.3)
             )
 
             # Extract Python code from markdown code blocks if present
-            if "```python" in action_code:
-                action_code = action_code.split("```python")[1].split("```")[0].strip()
-            elif "```" in action_code:
-                action_code = action_code.split("```")[1].split("```")[0].strip()
+            action_code = _extract_code(action_code)
 
             # Check if this is an exit action
             is_exit_action = "tools.exit" in action_code
@@ -490,8 +487,11 @@ tools.click(0.5, 0.3)
                 "iteration": iteration
             })
 
-            # Execute action
-            exec_result = self.execute_action(action_code)
+            # Execute action in a worker thread; tool calls such as waits and
+            # typing block for their whole duration
+            exec_result = await asyncio.get_running_loop().run_in_executor(
+                None, self.execute_action, action_code
+            )
 
             # Log tool execution result
             # print(f"Tool execution result: {exec_result}")
@@ -517,10 +517,10 @@ tools.click(0.5, 0.3)
             # Add delay before taking screenshot to allow UI to update
             # Skip delay if the action was already a wait command
             if not "tools.wait" in action_code:
-                time.sleep(self.screenshot_delay)
+                await asyncio.sleep(self.screenshot_delay)
 
-            # Capture screenshot after action
-            screenshot_after = self.get_screenshot_base64()
+            # Capture screenshot after action, off the event loop
+            screenshot_after = await asyncio.get_running_loop().run_in_executor(None, self.get_screenshot_base64)
 
             # Send verification start event
             self.send_llm_update("verification_start", {
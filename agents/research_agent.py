@@ -1,9 +1,10 @@
 import os
 import json
+from itertools import islice
 from typing import List, Dict, Any, Optional, Callable
 from agents.base_agent import BaseAgent
 import config as config_module
-from utils import strip_json_code_blocks
+from utils import parse_json_response
 
 
 class ResearchAgent(BaseAgent):
@@ -33,6 +34,7 @@ class ResearchAgent(BaseAgent):
             self.tavily_api_key = config_module.get_tavily_api_key(config_dict)
         else:
             self.tavily_api_key = os.environ.get("TAVILY_API_KEY")
+        self._tavily_client = None
 
     def get_system_prompt(self) -> str:
         """Get the system prompt for the research agent"""
@@ -74,10 +76,10 @@ When research is complete:
 ```
 """
 
-    def search_tavily(self, query: str) -> Dict[str, Any]:
+    async def search_tavily(self, query: str) -> Dict[str, Any]:
         """Search using Tavily API"""
         try:
-            from tavily import TavilyClient
+            from tavily import AsyncTavilyClient
 
             if not self.tavily_api_key:
                 return {
@@ -85,8 +87,10 @@ When research is complete:
                     "error": "Tavily API key not configured"
                 }
 
-            client = TavilyClient(api_key=self.tavily_api_key)
-            response = client.search(query, max_results=5)
+            # Create the client once and reuse its connection pool
+            if self._tavily_client is None:
+                self._tavily_client = AsyncTavilyClient(api_key=self.tavily_api_key)
+            response = await self._tavily_client.search(query, max_results=5)
 
             return {
                 "success": True,
@@ -105,6 +109,8 @@ When research is complete:
         max_iterations = message.get("max_iterations", 10)
         iteration = 0
         search_history: List[Dict[str, Any]] = []
+        # Formatted context lines for previous searches, extended once per search
+        search_context_parts: List[str] = []
 
         while iteration < max_iterations:
             iteration += 1
@@ -112,16 +118,9 @@ When research is complete:
             # Build context for LLM
             context_parts = [f"# Task\n\n{task}"]
 
-            if search_history:
+            if search_context_parts:
                 context_parts.append("\n# Previous Searches")
-                for i, item in enumerate(search_history, 1):
-                    context_parts.append(f"\n## Search {i}: {item['query']}")
-                    if item.get('results'):
-                        context_parts.append("Results:")
-                        for j, result in enumerate(item['results'][:3], 1):
-                            context_parts.append(f"{j}. {result.get('title', 'N/A')}")
-                            context_parts.append(f"   {result.get('content', 'N/A')[:200]}...")
-                            context_parts.append(f"   Source: {result.get('url', 'N/A')}")
+                context_parts.extend(search_context_parts)
 
             messages = [
                 {
@@ -138,8 +137,7 @@ When research is complete:
 
             # Parse response
             try:
-                cleaned_response = strip_json_code_blocks(response)
-                response_data = json.loads(cleaned_response)
+                response_data = parse_json_response(response)
             except json.JSONDecodeError:
                 # If not valid JSON, treat as error
                 return {
@@ -183,7 +181,7 @@ When research is complete:
                 })
 
                 # Execute search
-                search_result = self.search_tavily(query)
+                search_result = await self.search_tavily(query)
 
                 # Send search result
                 self.send_llm_update("search_result", {
@@ -191,13 +189,23 @@ When research is complete:
                 })
 
                 # Add to history
+                results = search_result.get("results", [])
                 search_history.append({
                     "query": query,
-                    "results": search_result.get("results", []),
+                    "results": results,
                     "success": search_result.get("success", False),
                     "error": search_result.get("error"),
                     "thought": response_data.get("thought", "")
                 })
+
+                # Format this search for the next prompts (top 3 results only)
+                search_context_parts.append(f"\n## Search {len(search_history)}: {query}")
+                if results:
+                    search_context_parts.append("Results:")
+                    for j, result in enumerate(islice(results, 3), 1):
+                        search_context_parts.append(f"{j}. {result.get('title', 'N/A')}")
+                        search_context_parts.append(f"   {result.get('content', 'N/A')[:200]}...")
+                        search_context_parts.append(f"   Source: {result.get('url', 'N/A')}")
             else:
                 return {
                     "success": False,
@@ -1,9 +1,12 @@
-import subprocess
+import asyncio
 import uuid
 import json
 from typing import List, Dict, Any, Optional, Callable
 from agents.base_agent import BaseAgent
-from utils import strip_json_code_blocks, compact_context, count_words
+from utils import parse_json_response, compact_context, count_words
+
+# Prefixes the working directory printed after a cd command
+_CWD_MARKER = "__KYROS_CWD__:"
 
 
 class ShellAgent(BaseAgent):
@@ -62,40 +65,53 @@ When the task is complete, respond with:
 ```
 """
 
-    def execute_command(self, cmd: str, timeout: int = 30) -> Dict[str, Any]:
+    async def execute_command(self, cmd: str, timeout: int = 30) -> Dict[str, Any]:
         """Execute a shell command and return the result"""
         try:
-            # Execute command with working directory if set
-            result = subprocess.run(
-                cmd,
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=timeout,
+            # For a cd command, print the new working directory in the same
+            # run instead of running the whole command a second time. pwd goes
+            # on its own line (so trailing ';', newlines and heredocs still
+            # parse) and the command's own exit status is preserved.
+            is_cd = cmd.strip().startswith("cd ")
+            if is_cd:
+                script = (
+                    f"{cmd}\n"
+                    f"__rc=$?; [ $__rc -eq 0 ] && printf '\\n{_CWD_MARKER}%s\\n' \"$(pwd)\"; exit $__rc"
+                )
+            else:
+                script = cmd
+
+            # Execute command with working directory if set; the agent awaits
+            # the process so the event loop keeps serving UI updates meanwhile
+            proc = await asyncio.create_subprocess_shell(
+                script,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
                 cwd=self.working_directory
             )
+            try:
+                stdout_bytes, stderr_bytes = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+                raise
+            stdout = stdout_bytes.decode(errors="replace")
 
             # Update working directory if this was a cd command
-            if cmd.strip().startswith("cd "):
-                if result.returncode == 0:
-                    # Get the new working directory
-                    pwd_result = subprocess.run(
-                        f"{cmd} && pwd",
-                        shell=True,
-                        capture_output=True,
-                        text=True,
-                        cwd=self.working_directory
-                    )
-                    if pwd_result.returncode == 0:
-                        self.working_directory = pwd_result.stdout.strip()
+            if is_cd and proc.returncode == 0:
+                # Everything before the marker belongs to the command
+                output, found, new_directory = stdout.rpartition(f"\n{_CWD_MARKER}")
+                if found:
+                    self.working_directory = new_directory.rstrip("\n")
+                    stdout = output
 
             return {
-                "stdout": result.stdout,
-                "stderr": result.stderr,
-                "exitCode": result.returncode,
+                "stdout": stdout,
+                "stderr": stderr_bytes.decode(errors="replace"),
+                "exitCode": proc.returncode,
                 "cwd": self.working_directory
             }
-        except subprocess.TimeoutExpired:
+        except asyncio.TimeoutError:
             return {
                 "stdout": "",
                 "stderr": f"Command timed out after {timeout} seconds",
@@ -179,8 +195,7 @@ When the task is complete, respond with:
 
                     # Parse response
                     try:
-                        cleaned_response = strip_json_code_blocks(response)
-                        response_data = json.loads(cleaned_response)
+                        response_data = parse_json_response(response)
                     except json.JSONDecodeError:
                         # If not valid JSON, treat as error
                         print(f"ERROR: ShellAgent received invalid JSON response: {response}")
@@ -223,7 +238,7 @@ When the task is complete, respond with:
                     })
 
                     # Execute command
-                    exec_result = self.execute_command(command)
+                    exec_result = await self.execute_command(command)
 
                     # Send execution result
                     self.send_llm_update("command_result", {
@@ -1,11 +1,25 @@
-import asyncio
 import json
 import base64
+import hashlib
 import re
+from collections import OrderedDict
 from typing import Dict, Any, Optional, Callable, List
 from agents.base_agent import BaseAgent
 from playwright.async_api import Page
-from utils import strip_json_code_blocks
+import config
+from utils import parse_json_response, get_llm_client, truncate_text
+
+# Number of cleaned page sources kept per agent
+CLEAN_HTML_CACHE_SIZE = 32
+
+# Head, script and style elements plus comments, matched in a single pass
+_STRIP_HTML_RE = re.compile(
+    r'<head\b[^>]*>.*?</head>'
+    r'|<script\b[^>]*>.*?</script>'
+    r'|<style\b[^>]*>.*?</style>'
+    r'|<!--.*?-->',
+    re.DOTALL | re.IGNORECASE
+)
 
 
 class XPathAgent(BaseAgent):
@@ -32,15 +46,14 @@ class XPathAgent(BaseAgent):
         self.config_dict = config_dict
         self.page: Optional[Page] = None
         self.browser_action_agent = browser_action_agent
+        # Cleaned HTML keyed by a digest of the raw page source (LRU order)
+        self._clean_html_cache: "OrderedDict[str, str]" = OrderedDict()
 
         # Create a separate client for verification (uses Qwen via Novita)
         self._init_verification_client()
 
     def _init_verification_client(self):
         """Initialize verification client using GUI agent config (Qwen via Novita)"""
-        import config
-        from openai import OpenAI
-
         # Get GUI agent config for verification (uses Qwen)
         gui_config = config.get_agent_config("gui", self.config_dict)
 
@@ -50,10 +63,11 @@ class XPathAgent(BaseAgent):
         self.verification_temperature = gui_config.get("temperature", 0.6)
         self.verification_max_tokens = gui_config.get("max_tokens", 30000)
 
-        # Create OpenAI client for Qwen/Novita
-        self.verification_client = OpenAI(
-            api_key=self.verification_api_key,
-            base_url=self.verification_base_url
+        # Shared OpenAI-compatible client for Qwen/Novita
+        self.verification_client = get_llm_client(
+            "openai",
+            self.verification_api_key,
+            self.verification_base_url
         )
 
     def get_system_prompt(self) -> str:
@@ -122,19 +136,8 @@ Query: "find xpath for login button"
 
     def clean_html(self, html: str) -> str:
         """Clean HTML by removing head, script, and style tags"""
-        # Remove head tag and its contents
-        html = re.sub(r'<head\b[^>]*>.*?</head>', '', html, flags=re.DOTALL | re.IGNORECASE)
-
-        # Remove script tags and their contents
-        html = re.sub(r'<script\b[^>]*>.*?</script>', '', html, flags=re.DOTALL | re.IGNORECASE)
-
-        # Remove style tags and their contents
-        html = re.sub(r'<style\b[^>]*>.*?</style>', '', html, flags=re.DOTALL | re.IGNORECASE)
-
-        # Remove comments
-        html = re.sub(r'<!--.*?-->', '', html, flags=re.DOTALL).strip()
-
-        return html
+        # Remove head, script and style tags with their contents, and comments
+        return _STRIP_HTML_RE.sub('', html).strip()
 
     def set_page(self, page: Page):
         """Set the browser page to work with"""
@@ -151,7 +154,19 @@ Query: "find xpath for login button"
             raise ValueError(error_msg)
 
         html = await self.page.content()
-        return self.clean_html(html)
+
+        # Repeated queries against the same page skip re-cleaning the source
+        key = hashlib.blake2b(html.encode(), digest_size=16).hexdigest()
+        cached = self._clean_html_cache.get(key)
+        if cached is not None:
+            self._clean_html_cache.move_to_end(key)
+            return cached
+
+        cleaned = self.clean_html(html)
+        self._clean_html_cache[key] = cleaned
+        if len(self._clean_html_cache) > CLEAN_HTML_CACHE_SIZE:
+            self._clean_html_cache.popitem(last=False)
+        return cleaned
 
     async def highlight_and_screenshot(self, xpath: str) -> Dict[str, Any]:
         """Highlight element by XPath and take screenshot"""
@@ -207,8 +222,8 @@ Query: "find xpath for login button"
                 highlightBox.style.left = rect.left + window.scrollX + 'px';
                 highlightBox.style.top = rect.top + window.scrollY + 'px';
 
-                // Scroll element into view if needed
-                element.scrollIntoView({ behavior: 'smooth', block: 'center' });
+                // Scroll element into view; instant, so the screenshot can be taken right away
+                element.scrollIntoView({ behavior: 'instant', block: 'center' });
 
                 return {
                   found: true,
@@ -234,9 +249,6 @@ Query: "find xpath for login button"
                     "count": highlight_result.get("count", 0)
                 }
 
-            # Wait a bit for scrolling
-            await asyncio.sleep(0.3)
-
             # Take screenshot
             screenshot_bytes = await self.page.screenshot()
             screenshot_b64 = base64.b64encode(screenshot_bytes).decode('utf-8')
@@ -341,14 +353,13 @@ Respond with JSON:
 
             # Send content chunk for status animation
             self.send_llm_update("llm_content_chunk", {
-                "content": response_text[:100] + "..." if len(response_text) > 100 else response_text
+                "content": truncate_text(response_text)
             })
 
             # Send LLM call end event
             self.send_llm_update("llm_call_end", {})
 
-            cleaned_response = strip_json_code_blocks(response_text)
-            return json.loads(cleaned_response)
+            return parse_json_response(response_text)
         except json.JSONDecodeError:
             self.send_llm_update("llm_call_end", {})
             return {
@@ -388,13 +399,9 @@ Respond with JSON:
                     "error": "Failed to get page HTML"
                 }
 
-            # Iteration loop: generate xpath, verify, repeat if needed
-            while iteration < max_iterations:
-                iteration += 1
-
-                # Step 2: Generate XPath using Claude LLM
-
-                context = f"""# Query
+            # The query and page source do not change between attempts,
+            # so build that part of the prompt once
+            base_context = f"""# Query
 {query}
 
 # HTML Source (cleaned)
@@ -405,6 +412,13 @@ Respond with JSON:
 Generate an XPath expression for the query.
 """
 
+            # Iteration loop: generate xpath, verify, repeat if needed
+            while iteration < max_iterations:
+                iteration += 1
+
+                # Step 2: Generate XPath using Claude LLM
+                context = base_context
+
                 # Add feedback from previous iteration if available
                 if history:
                     last_entry = history[-1]
@@ -427,8 +441,7 @@ Generate an XPath expression for the query.
 
                 # Parse response
                 try:
-                    cleaned_response = strip_json_code_blocks(response)
-                    xpath_data = json.loads(cleaned_response)
+                    xpath_data = parse_json_response(response)
                 except json.JSONDecodeError:
                     return {
                         "success": False,
@@ -1,10 +1,6 @@
-import base64
 import subprocess
-from io import BytesIO
 from typing import List, Dict, Any
-import tempfile
-import os
-from PIL import Image
+from utils import capture_screenshot_base64
 
 
 class ContextManager:
@@ -43,45 +39,8 @@ class ContextManager:
         })
 
     def get_screenshot_base64(self) -> str:
-        """Capture screenshot and return as base64-encoded JPEG using scrot"""
-        # Create temp file and close it immediately so scrot can write to it
-        temp_fd, temp_path = tempfile.mkstemp(suffix='.png')
-        os.close(temp_fd)  # Close the file descriptor immediately
-
-        # Remove the empty file that mkstemp created
-        if os.path.exists(temp_path):
-            os.unlink(temp_path)
-
-        try:
-            # Capture with scrot (ensure DISPLAY is set)
-            env = os.environ.copy()
-            if 'DISPLAY' not in env:
-                env['DISPLAY'] = ':0'
-
-            result = subprocess.run(
-                ["scrot", temp_path],
-                capture_output=True,
-                timeout=2,
-                env=env
-            )
-
-            if result.returncode != 0:
-                raise RuntimeError(f"scrot failed with code {result.returncode}: {result.stderr.decode()}")
-
-            if not os.path.exists(temp_path) or os.path.getsize(temp_path) == 0:
-                raise RuntimeError(f"scrot did not create screenshot file at {temp_path}")
-
-            # Load and convert to JPEG
-            screenshot = Image.open(temp_path)
-            buffer = BytesIO()
-            screenshot.save(buffer, format="JPEG", quality=75)
-            buffer.seek(0)
-            img_base64 = base64.b64encode(buffer.read()).decode('utf-8')
-            return f"data:image/jpeg;base64,{img_base64}"
-        finally:
-            # Clean up temp file
-            if os.path.exists(temp_path):
-                os.unlink(temp_path)
+        """Capture screenshot and return as base64-encoded JPEG"""
+        return capture_screenshot_base64(':0')
 
     def get_active_windows(self) -> str:
         """Get list of active windows using wmctrl"""
@@ -1,12 +1,17 @@
 import sys
 import argparse
 import asyncio
-from typing import Dict, Any
+from typing import Dict, Any, List
 from agents.boss_agent import BossAgent
 from websocket_server import WebSocketServer
 from terminal_ui import terminal_ui
 import config
-import time
+
+# uvloop is a faster drop-in event loop; use it when it is installed
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
 
 
 class MultiAgentOrchestrator:
@@ -53,9 +58,10 @@ class MultiAgentOrchestrator:
                 await self.initialize()
 
             # Send task to boss agent
+            agent_responses: List[Dict[str, Any]] = []
             message = {
                 "content": task,
-                "agent_responses": []
+                "agent_responses": agent_responses
             }
 
             max_iterations = 20
@@ -104,17 +110,14 @@ class MultiAgentOrchestrator:
                                 print(f"{'='*60}")
                                 user_response = input("Your response: ").strip()
 
-                            time.sleep(5)
+                            await asyncio.sleep(5)
 
                             # Add user response to message for next iteration
                             if not user_response:
                                 user_response = "No response provided"
 
                             # Add to agent responses
-                            if "agent_responses" not in message:
-                                message["agent_responses"] = []
-
-                            message["agent_responses"].append({
+                            agent_responses.append({
                                 "agent_type": "User",
                                 "agent_id": "user",
                                 "response": {
@@ -168,10 +171,7 @@ class MultiAgentOrchestrator:
                             })
 
                             # Add subagent response to message for next iteration
-                            if "agent_responses" not in message:
-                                message["agent_responses"] = []
-
-                            message["agent_responses"].append({
+                            agent_responses.append({
                                 "agent_type": agent_type,
                                 # "agent_id": agent.agent_id,
                                 "response": subagent_response
@@ -182,9 +182,7 @@ class MultiAgentOrchestrator:
                             import traceback
                             traceback.print_exc()
                             # Continue to next iteration with error info
-                            if "agent_responses" not in message:
-                                message["agent_responses"] = []
-                            message["agent_responses"].append({
+                            agent_responses.append({
                                 "agent_type": agent_type,
                                 "agent_id": "unknown",
                                 "response": {
@@ -250,7 +248,7 @@ async def main():
 
         async def task_handler(request):
             try:
-                time.sleep(2)
+                await asyncio.sleep(2)
 
                 data = await request.json()
                 task = data.get('task')
@@ -319,6 +317,8 @@ async def main():
 
 
 if __name__ == "__main__":
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     try:
         asyncio.run(main())
     except (KeyboardInterrupt, EOFError, SystemExit, asyncio.exceptions.CancelledError):
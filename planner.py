@@ -11,9 +11,8 @@ import base64
 import sys
 import argparse
 from typing import Dict, Any, Optional
-from anthropic import Anthropic
-from openai import OpenAI
 from config import load_config
+from utils import get_llm_client
 
 
 def encode_image_to_base64(image_path: str) -> tuple[str, str]:
@@ -51,7 +50,8 @@ def generate_instruction(
     previous_actions: Optional[list] = None,
     config_dict: Optional[Dict[str, Any]] = None,
     api_provider: str = "anthropic",
-    model: Optional[str] = None
+    model: Optional[str] = None,
+    verbose: bool = False
 ) -> Dict[str, Any]:
     """
     Generate a low-level instruction using a vision-language model
@@ -64,6 +64,7 @@ def generate_instruction(
         config_dict: Configuration dictionary
         api_provider: API provider to use ('anthropic' or 'openai')
         model: Model name (optional, uses default from provider)
+        verbose: Print request diagnostics (image size, provider, model)
 
     Returns:
         Dictionary with 'instruction' and 'reasoning' keys
@@ -73,9 +74,11 @@ def generate_instruction(
         config_dict = load_config()
 
     # Encode screenshot
-    print(f"Encoding screenshot from: {screenshot_path}")
+    if verbose:
+        print(f"Encoding screenshot from: {screenshot_path}")
     screenshot_data, media_type = encode_image_to_base64(screenshot_path)
-    print(f"Encoded image size: {len(screenshot_data)} chars, type: {media_type}")
+    if verbose:
+        print(f"Encoded image size: {len(screenshot_data)} chars, type: {media_type}")
 
     # Build context
     context_parts = [f"# Task\n\n{task}"]
@@ -143,8 +146,8 @@ Click on the Firefox icon in the taskbar at the bottom of the screen
         if not api_key:
             raise ValueError("Anthropic API key not found in config")
 
-        # Initialize Anthropic client
-        client = Anthropic(api_key=api_key)
+        # Reuse the shared Anthropic client (and its connection pool)
+        client = get_llm_client("anthropic", api_key)
 
         # Use default model if not specified
         if model is None:
@@ -189,18 +192,19 @@ Click on the Firefox icon in the taskbar at the bottom of the screen
         if not api_key:
             raise ValueError(f"{api_provider} API key not found in config")
 
-        # Initialize OpenAI client
-        client = OpenAI(api_key=api_key, base_url=base_url)
+        # Reuse the shared OpenAI-compatible client (and its connection pool)
+        client = get_llm_client("openai", api_key, base_url)
 
         # Use default model if not specified
         if model is None:
             model = "gpt-4o"
 
-        print(f"Using API provider: {api_provider}")
-        print(f"Using model: {model}")
-        print(f"Base URL: {base_url}")
-        print(f"Context length: {len(context_text)} chars")
-        print(f"Image size: {len(screenshot_data)} chars")
+        if verbose:
+            print(f"Using API provider: {api_provider}")
+            print(f"Using model: {model}")
+            print(f"Base URL: {base_url}")
+            print(f"Context length: {len(context_text)} chars")
+            print(f"Image size: {len(screenshot_data)} chars")
 
         # Create message with image (OpenAI format)
         try:
@@ -235,7 +239,8 @@ Click on the Firefox icon in the taskbar at the bottom of the screen
             response_text = response.choices[0].message.content
         except Exception as e:
             print(f"API Error: {e}")
-            print(f"Request details - model: {model}, max_tokens: 1000, temp: 0.5")
+            if verbose:
+                print(f"Request details - model: {model}, max_tokens: 1000, temp: 0.5")
             raise
 
 
@@ -275,6 +280,7 @@ def main():
     parser.add_argument('--api-provider', default='anthropic', choices=['anthropic', 'openai', 'novita', 'internlm'],
                         help='API provider to use (default: anthropic)')
     parser.add_argument('--model', help='Model name (default: claude-sonnet-4-5 for anthropic, gpt-4o for openai)')
+    parser.add_argument('--verbose', action='store_true', help='Print request diagnostics')
 
     args = parser.parse_args()
 
@@ -285,7 +291,8 @@ def main():
             active_windows=args.windows,
             previous_actions=args.previous,
             api_provider=args.api_provider,
-            model=args.model
+            model=args.model,
+            verbose=args.verbose
         )
 
         print("=" * 80)
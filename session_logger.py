@@ -4,6 +4,21 @@ import base64
 from datetime import datetime
 from typing import List, Dict, Any
 
+# Use orjson for session serialization when it is installed
+try:
+    import orjson
+
+    def dumps_pretty(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_INDENT_2)
+except ImportError:
+    def dumps_pretty(obj: Any) -> bytes:
+        return json.dumps(obj, indent=2).encode()
+
+
+def _is_data_image(value: Any) -> bool:
+    """Check whether value is an inline base64 image data URI"""
+    return isinstance(value, str) and value.startswith("data:image")
+
 
 class SessionLogger:
     """Logs agent sessions to JSON files for learning and analysis"""
@@ -35,6 +50,14 @@ class SessionLogger:
         }
         self.screenshot_counter = 0
 
+    def _write_snapshot(self, path: str):
+        """Write session_data to path via a temp file and an atomic rename,
+        so a crash mid-write never leaves a truncated JSON behind"""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb', buffering=1 << 16) as f:
+            f.write(dumps_pretty(self.session_data))
+        os.replace(tmp_path, path)
+
     def set_task(self, task: str):
         """Set the initial task for the session"""
         self.session_data["task"] = task
@@ -84,13 +107,23 @@ class SessionLogger:
 
         for item in context:
             item_copy = item.copy()
-
-            # Handle observation items with screenshots
-            if item["type"] == "observation" and isinstance(item["content"], dict):
-                if "screenshot" in item["content"]:
-                    screenshot_path = self._save_screenshot(item["content"]["screenshot"])
-                    item_copy["content"] = item["content"].copy()
-                    item_copy["content"]["screenshot"] = screenshot_path
+            content = item.get("content")
+
+            # Replace inline images (observation screenshots or any other
+            # data URI) with the path of the saved file
+            if item["type"] == "observation" and isinstance(content, dict):
+                if "screenshot" in content:
+                    item_copy["content"] = content = content.copy()
+                    content["screenshot"] = self._save_screenshot(content["screenshot"])
+            if isinstance(content, dict):
+                image_keys = [k for k, v in content.items() if _is_data_image(v)]
+                if image_keys:
+                    if content is item.get("content"):
+                        item_copy["content"] = content = content.copy()
+                    for key in image_keys:
+                        content[key] = self._save_screenshot(content[key])
+            elif _is_data_image(content):
+                item_copy["content"] = self._save_screenshot(content)
 
             processed_context.append(item_copy)
 
@@ -107,8 +140,7 @@ class SessionLogger:
         self.session_data["iterations"] = iteration
 
         # Write to file immediately for real-time logging
-        with open(self.session_file, 'w') as f:
-            json.dump(self.session_data, f, indent=2)
+        self._write_snapshot(self.session_file)
 
     def finalize_session(self, exit_code: int):
         """Finalize and save the session
@@ -120,8 +152,7 @@ class SessionLogger:
         self.session_data["exit_code"] = exit_code
 
         # Write to file
-        with open(self.session_file, 'w') as f:
-            json.dump(self.session_data, f, indent=2)
+        self._write_snapshot(self.session_file)
 
         print(f"\n📁 Session saved to: {self.session_file}")
         print(f"📸 Screenshots saved to: {self.screenshots_dir}")
@@ -137,5 +168,4 @@ class SessionLogger:
             f"session_{self.session_id}_checkpoint_{iteration}.json"
         )
 
-        with open(checkpoint_file, 'w') as f:
-            json.dump(self.session_data, f, indent=2)
+        self._write_snapshot(checkpoint_file)
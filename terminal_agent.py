@@ -11,8 +11,12 @@ from terminal_ui import terminal_ui
 import config
 import readline
 import atexit
-import json
-import time
+
+# uvloop is a faster drop-in event loop; use it when it is installed
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
 
 
 class TerminalAgent:
@@ -83,7 +87,7 @@ class TerminalAgent:
     async def process_task(self, task: str) -> Dict[str, Any]:
         """Process a single task"""
         try:
-            time.sleep(3)
+            await asyncio.sleep(3)
 
             if not self.boss_agent:
                 await self.initialize()
@@ -95,9 +99,10 @@ class TerminalAgent:
             })
 
             # Send task to boss agent
+            agent_responses: List[Dict[str, Any]] = []
             message = {
                 "content": task,
-                "agent_responses": []
+                "agent_responses": agent_responses
             }
 
             max_iterations = 20
@@ -150,10 +155,7 @@ class TerminalAgent:
                                 user_response = "No response provided"
 
                             # Add to agent responses
-                            if "agent_responses" not in message:
-                                message["agent_responses"] = []
-
-                            message["agent_responses"].append({
+                            agent_responses.append({
                                 "agent_type": "User",
                                 "agent_id": "user",
                                 "response": {
@@ -203,17 +205,19 @@ class TerminalAgent:
                             # Build message with context from previous responses
                             full_message = agent_message
                             # For BrowserBossAgent, include known xpaths from previous delegations
-                            if agent_type == "BrowserBossAgent" and "agent_responses" in message:
+                            if agent_type == "BrowserBossAgent":
                                 known_xpaths = []
-                                for prev_resp in message.get("agent_responses", []):
+                                for prev_resp in agent_responses:
                                     if prev_resp.get("agent_type") == "BrowserBossAgent":
                                         resp_data = prev_resp.get("response", {})
                                         summary = resp_data.get("summary", "")
                                         # Extract "Known XPaths:" section if it exists
-                                        if "Known XPaths:" in summary:
+                                        marker = summary.find("Known XPaths:")
+                                        if marker != -1:
+                                            start = marker + len("Known XPaths:")
+                                            end = summary.find("Known XPaths:", start)
                                             full_message += "\n\nKnown XPaths from previous work:\n"
-                                            xpath_section = summary.split("Known XPaths:")[1]
-                                            full_message += xpath_section
+                                            full_message += summary[start:end] if end != -1 else summary[start:]
 
                             # Process message with subagent
                             subagent_response = await agent.process_message({
@@ -221,10 +225,7 @@ class TerminalAgent:
                             })
 
                             # Add subagent response to message for next iteration
-                            if "agent_responses" not in message:
-                                message["agent_responses"] = []
-
-                            message["agent_responses"].append({
+                            agent_responses.append({
                                 "agent_type": agent_type,
                                 "response": subagent_response
                             })
@@ -234,9 +235,7 @@ class TerminalAgent:
                             import traceback
                             traceback.print_exc()
                             # Continue to next iteration with error info
-                            if "agent_responses" not in message:
-                                message["agent_responses"] = []
-                            message["agent_responses"].append({
+                            agent_responses.append({
                                 "agent_type": agent_type,
                                 "agent_id": "unknown",
                                 "response": {
@@ -360,6 +359,8 @@ async def main():
 
 
 if __name__ == "__main__":
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
@@ -5,9 +5,8 @@ Terminal UI module for displaying agent outputs in a Claude Code-like interface.
 import sys
 import os
 import time
-from typing import Dict, Any, Optional
-from colorama import init, Fore, Style, Back
-import textwrap
+from typing import Dict, Any
+from colorama import init, Fore, Style
 
 # Initialize colorama for cross-platform color support
 init(autoreset=True)
@@ -18,6 +17,26 @@ ASCII_ART = """
 ╩ ╩  ╩  ╩╚═ ╚═╝ ╚═╝
 """
 
+# Display color per agent - use consistent colors
+AGENT_COLORS = {
+    'gui': Fore.CYAN,
+    'shell': Fore.CYAN,
+    'browser': Fore.CYAN,
+    'browseraction': Fore.CYAN,
+    'browserboss': Fore.CYAN,
+    'research': Fore.CYAN,
+    'xpath': Fore.CYAN,
+}
+
+# Pre-styled fragments of delegation and action lines
+DELEGATION_ARROW = Fore.WHITE + Style.DIM + " -> " + Style.RESET_ALL
+DELEGATION_COLON = Fore.WHITE + Style.DIM + ": " + Style.RESET_ALL
+ACTION_CHECKMARK = Fore.GREEN + " ✓" + Style.RESET_ALL
+VERIFIED_CHECKMARK = Fore.GREEN + " ✓✓" + Style.RESET_ALL
+
+# Move up and clear the status line, then the blank line above it
+CLEAR_STATUS_LINES = '\033[F\033[K' * 2
+
 class TerminalUI:
     """Manages terminal output formatting for agent system"""
 
@@ -40,6 +59,22 @@ class TerminalUI:
         self.status_start_time = 0  # Track when status started for timeout detection
         self.STATUS_TIMEOUT = 30  # Clear status after 30 seconds of inactivity
 
+        # Display handler per event type; task_submitted, thought and
+        # action_result events are not shown (checkmarks are shown inline)
+        self._event_handlers = {
+            'delegation': self._on_delegation,
+            'llm_call_start': self._on_llm_call_start,
+            'llm_content_chunk': self._on_llm_content_chunk,
+            'llm_call_end': self._on_llm_call_end,
+            'action_execute': self._on_action_execute,
+            'verification_start': self._on_verification_start,
+            'verification_update': self._on_verification_update,
+            'verification_end': self._on_verification_end,
+            'compaction_start': self._on_compaction_start,
+            'compaction_end': self._on_compaction_end,
+            'task_completed': self._on_task_completed,
+        }
+
     def clear_screen(self):
         """Clear the terminal screen"""
         os.system('cls' if os.name == 'nt' else 'clear')
@@ -86,10 +121,8 @@ class TerminalUI:
             from_clean = "Browser"
 
         prefix = Fore.GREEN + Style.BRIGHT + from_clean + Style.RESET_ALL
-        arrow = Fore.WHITE + Style.DIM + " -> " + Style.RESET_ALL
         agent = Fore.CYAN + Style.BRIGHT + to_clean + Style.RESET_ALL
-        colon = Fore.WHITE + Style.DIM + ": " + Style.RESET_ALL
-        return f"{prefix}{arrow}{agent}{colon}{message}"
+        return f"{prefix}{DELEGATION_ARROW}{agent}{DELEGATION_COLON}{message}"
 
     def format_action_message(self, action, agent_type: str = None, is_first: bool = False) -> str:
         """Format an action execution message"""
@@ -120,19 +153,9 @@ class TerminalUI:
             if agent_type == "BrowserAction":
                 agent_type = "Browser"
 
-        # Determine agent color - use consistent colors
-        agent_colors = {
-            'gui': Fore.CYAN,
-            'shell': Fore.CYAN,
-            'browser': Fore.CYAN,
-            'browseraction': Fore.CYAN,
-            'browserboss': Fore.CYAN,
-            'research': Fore.CYAN,
-            'xpath': Fore.CYAN,
-        }
-
+        # Determine agent color
         agent_name = agent_type.lower() if agent_type else 'browser'
-        color = agent_colors.get(agent_name, Fore.CYAN)
+        color = AGENT_COLORS.get(agent_name, Fore.CYAN)
 
         if is_first:
             # First action shows the agent label
@@ -141,138 +164,126 @@ class TerminalUI:
             # Subsequent actions align with first
             prefix = " " * len(agent_type) + "  "
 
-        checkmark = Fore.GREEN + " ✓" + Style.RESET_ALL
-        return f"{prefix}{action_str}{checkmark}"
+        return f"{prefix}{action_str}{ACTION_CHECKMARK}"
 
 
     def handle_event(self, event: Dict[str, Any]):
         """Handle a WebSocket event and update display"""
-        event_type = event.get('type')
-        data = event.get('data', {})
-
-        if event_type == 'task_submitted':
-            # Skip task submission in clean mode
-            pass
-
-        elif event_type == 'delegation':
-            # Clear any status before showing delegation
-            self.clear_status()
-            # Show delegation: FromAgent -> ToAgent: message
-            from_agent = data.get('from_agent', 'Boss')
-            to_agent = data.get('agent_type', data.get('to_agent', 'Unknown'))
-            message = data.get('message', '')
-            print(self.format_delegation(from_agent, to_agent, message))
-
-        elif event_type == 'llm_call_start':
-            # Track which agent is calling LLM but don't show status yet
-            agent_type = event.get('agent_type', data.get('purpose', ''))
-            self.in_llm_call = True
-            self.llm_buffer = ""
-            self.current_agent_name = agent_type
-
-            # Check if this is for compaction, verification, or regular thinking
-            if 'context_compaction' in agent_type or data.get('purpose') == 'context_compaction':
-                if self.current_status_type not in ["Verifying"]:
-                    self.current_status_type = "Compacting"
-            elif self.current_status_type not in ["Verifying", "Compacting"]:
-                self.current_status_type = "Thinking"
-            # Don't show status yet - wait for first chunk
-
-        elif event_type == 'llm_content_chunk':
-            # Accumulate LLM response chunks and update status animation
-            chunk = data.get('content', '')
-            self.llm_buffer += chunk
-            # Show appropriate status based on current operation
-            if self.current_status_type == "Verifying":
-                self.show_status("Verifying")
-            elif self.current_status_type == "Compacting":
-                self.show_status("Compacting")
-            elif self.current_status_type == "Thinking":
-                self.show_status("Thinking")
-            elif self.in_llm_call:
-                self.show_status("Thinking")
-
-        elif event_type == 'llm_call_end':
-            # Clear thinking status and stop LLM call tracking
-            self.in_llm_call = False
-            self.llm_buffer = ""
-            # Only clear status if it was Thinking (not Verifying/Compacting)
-            if self.current_status_type == "Thinking":
-                self.current_status_type = None
-                self.clear_status()
-
-        elif event_type == 'action_execute':
-            # Clear any status before showing action
-            self.clear_status()
-            action = data.get('action', '')
-            agent_type = event.get('agent_type', 'Browser')
-
-            # Check if this is a new agent starting actions
-            if self.current_agent_for_actions != agent_type:
-                self.current_agent_for_actions = agent_type
-                self.action_count = 0
-
-            # Format and show action (format_action_message will clean up the name)
-            is_first = self.action_count == 0
-            self.action_count += 1
-            action_output = self.format_action_message(action, agent_type, is_first)
-            print(action_output)
-
-            # Track how many lines this action took (for adding verification checkmark later)
-            self.last_action_line_count = action_output.count('\n') + 1
-
-        elif event_type == 'thought':
-            # Skip thought events
-            pass
-
-        elif event_type == 'action_result':
-            # Skip action results - checkmarks shown inline
-            pass
-
-        elif event_type == 'verification_start':
-            # Set status type and show verifying status
-            self.clear_status()  # Clear any existing status first
-            self.current_status_type = "Verifying"
-            self.show_status("Verifying")
-
-        elif event_type == 'verification_update':
-            # Update verifying animation
-            self.current_status_type = "Verifying"
+        handler = self._event_handlers.get(event.get('type'))
+        if handler:
+            handler(event, event.get('data', {}))
+
+    def _on_delegation(self, event: Dict[str, Any], data: Dict[str, Any]):
+        # Clear any status before showing delegation
+        self.clear_status()
+        # Show delegation: FromAgent -> ToAgent: message
+        from_agent = data.get('from_agent', 'Boss')
+        to_agent = data.get('agent_type', data.get('to_agent', 'Unknown'))
+        message = data.get('message', '')
+        print(self.format_delegation(from_agent, to_agent, message))
+
+    def _on_llm_call_start(self, event: Dict[str, Any], data: Dict[str, Any]):
+        # Track which agent is calling LLM but don't show status yet
+        agent_type = event.get('agent_type', data.get('purpose', ''))
+        self.in_llm_call = True
+        self.llm_buffer = ""
+        self.current_agent_name = agent_type
+
+        # Check if this is for compaction, verification, or regular thinking
+        if 'context_compaction' in agent_type or data.get('purpose') == 'context_compaction':
+            if self.current_status_type not in ["Verifying"]:
+                self.current_status_type = "Compacting"
+        elif self.current_status_type not in ["Verifying", "Compacting"]:
+            self.current_status_type = "Thinking"
+        # Don't show status yet - wait for first chunk
+
+    def _on_llm_content_chunk(self, event: Dict[str, Any], data: Dict[str, Any]):
+        # Accumulate LLM response chunks and update status animation
+        chunk = data.get('content', '')
+        self.llm_buffer += chunk
+        # Show appropriate status based on current operation
+        if self.current_status_type == "Verifying":
             self.show_status("Verifying")
-
-        elif event_type == 'verification_end':
-            # Clear verifying status completely
-            self.current_status_type = None
-            self.clear_status()
-            # Check if verification was successful
-            success = data.get('success', data.get('correct', False))
-            if success:
-                self.add_verification_checkmark()
-            # Ensure status is cleared after adding checkmark
-            self.clear_status()
-
-        elif event_type == 'compaction_start':
-            # Set status type and show compacting status
-            self.clear_status()  # Clear any existing status
-            self.current_status_type = "Compacting"
+        elif self.current_status_type == "Compacting":
             self.show_status("Compacting")
+        elif self.current_status_type == "Thinking":
+            self.show_status("Thinking")
+        elif self.in_llm_call:
+            self.show_status("Thinking")
 
-        elif event_type == 'compaction_end':
-            # Clear compacting status
+    def _on_llm_call_end(self, event: Dict[str, Any], data: Dict[str, Any]):
+        # Clear thinking status and stop LLM call tracking
+        self.in_llm_call = False
+        self.llm_buffer = ""
+        # Only clear status if it was Thinking (not Verifying/Compacting)
+        if self.current_status_type == "Thinking":
             self.current_status_type = None
             self.clear_status()
 
-        elif event_type == 'task_completed':
-            # Clear any status before showing completion
-            self.clear_status()
-            result = event.get('result', data.get('result', ''))
-            print()
-            print(Fore.GREEN + Style.BRIGHT + "=" * 60)
-            print("TASK COMPLETED")
-            print("=" * 60 + Style.RESET_ALL)
-            if result:
-                print(result)
-            print()
+    def _on_action_execute(self, event: Dict[str, Any], data: Dict[str, Any]):
+        # Clear any status before showing action
+        self.clear_status()
+        action = data.get('action', '')
+        agent_type = event.get('agent_type', 'Browser')
+
+        # Check if this is a new agent starting actions
+        if self.current_agent_for_actions != agent_type:
+            self.current_agent_for_actions = agent_type
+            self.action_count = 0
+
+        # Format and show action (format_action_message will clean up the name)
+        is_first = self.action_count == 0
+        self.action_count += 1
+        action_output = self.format_action_message(action, agent_type, is_first)
+        print(action_output)
+
+        # Track how many lines this action took (for adding verification checkmark later)
+        self.last_action_line_count = action_output.count('\n') + 1
+
+    def _on_verification_start(self, event: Dict[str, Any], data: Dict[str, Any]):
+        # Set status type and show verifying status
+        self.clear_status()  # Clear any existing status first
+        self.current_status_type = "Verifying"
+        self.show_status("Verifying")
+
+    def _on_verification_update(self, event: Dict[str, Any], data: Dict[str, Any]):
+        # Update verifying animation
+        self.current_status_type = "Verifying"
+        self.show_status("Verifying")
+
+    def _on_verification_end(self, event: Dict[str, Any], data: Dict[str, Any]):
+        # Clear verifying status completely
+        self.current_status_type = None
+        self.clear_status()
+        # Check if verification was successful
+        success = data.get('success', data.get('correct', False))
+        if success:
+            self.add_verification_checkmark()
+        # Ensure status is cleared after adding checkmark
+        self.clear_status()
+
+    def _on_compaction_start(self, event: Dict[str, Any], data: Dict[str, Any]):
+        # Set status type and show compacting status
+        self.clear_status()  # Clear any existing status
+        self.current_status_type = "Compacting"
+        self.show_status("Compacting")
+
+    def _on_compaction_end(self, event: Dict[str, Any], data: Dict[str, Any]):
+        # Clear compacting status
+        self.current_status_type = None
+        self.clear_status()
+
+    def _on_task_completed(self, event: Dict[str, Any], data: Dict[str, Any]):
+        # Clear any status before showing completion
+        self.clear_status()
+        result = event.get('result', data.get('result', ''))
+        print()
+        print(Fore.GREEN + Style.BRIGHT + "=" * 60)
+        print("TASK COMPLETED")
+        print("=" * 60 + Style.RESET_ALL)
+        if result:
+            print(result)
+        print()
 
     def prompt_user(self, prompt_text: str) -> str:
         """Display a prompt and get user input"""
@@ -296,7 +307,8 @@ class TerminalUI:
     def show_status(self, status_type: str):
         """Show a status line with animated loader (Thinking/Verifying/Compacting)"""
         # Throttle updates to slow down animation (200ms between updates)
-        current_time = time.time()
+        # Monotonic clock: throttling and timeouts must not jump with wall-clock changes
+        current_time = time.monotonic()
         if current_time - self.last_status_update < 0.2:
             return
         self.last_status_update = current_time
@@ -312,11 +324,7 @@ class TerminalUI:
             return
 
         # Clear previous status line if shown (goes back 2 lines: blank + status)
-        if self.status_line_shown:
-            sys.stdout.write('\033[F')  # Move cursor up one line (status)
-            sys.stdout.write('\033[K')  # Clear line
-            sys.stdout.write('\033[F')  # Move cursor up one line (blank)
-            sys.stdout.write('\033[K')  # Clear line
+        clear = CLEAR_STATUS_LINES if self.status_line_shown else ""
 
         # Cycle through 0-3 dots
         self.status_dot_count = (self.status_dot_count + 1) % 4
@@ -324,10 +332,9 @@ class TerminalUI:
 
         # Format status message (remove \n from status_type if present)
         clean_status = status_type.replace('\n', '')
-        # Print blank line then status
-        print()  # Blank line for spacing
         status_msg = Fore.YELLOW + Style.DIM + f"{clean_status}{dots}" + Style.RESET_ALL
-        print(status_msg)
+        # Clear, blank line for spacing, then status - all in a single write
+        sys.stdout.write(f"{clear}\n{status_msg}\n")
         sys.stdout.flush()
 
         self.status_line_shown = True
@@ -335,10 +342,7 @@ class TerminalUI:
     def clear_status(self):
         """Clear the status line"""
         if self.status_line_shown:
-            sys.stdout.write('\033[F')  # Move cursor up one line (status)
-            sys.stdout.write('\033[K')  # Clear line
-            sys.stdout.write('\033[F')  # Move cursor up one line (blank)
-            sys.stdout.write('\033[K')  # Clear line
+            sys.stdout.write(CLEAR_STATUS_LINES)
             sys.stdout.flush()
             self.status_line_shown = False
             self.status_dot_count = 0
@@ -348,19 +352,14 @@ class TerminalUI:
     def add_verification_checkmark(self):
         """Add a second checkmark to the last action line to indicate successful verification"""
         if self.last_action_line_count > 0:
-            # Move cursor up to the last action line
-            for _ in range(self.last_action_line_count):
-                sys.stdout.write('\033[F')
-
-            # Move to end of line and add second checkmark
-            sys.stdout.write('\033[999C')  # Move to far right
-            sys.stdout.write('\b\b\b')  # Move back 3 characters
-            sys.stdout.write(Fore.GREEN + " ✓✓" + Style.RESET_ALL)
-
-            # Move cursor back down
-            for _ in range(self.last_action_line_count):
-                sys.stdout.write('\n')
-
+            sys.stdout.write(
+                # Move cursor up to the last action line
+                '\033[F' * self.last_action_line_count
+                # Move to far right, back 3 characters, and add second checkmark
+                + '\033[999C' + '\b\b\b' + VERIFIED_CHECKMARK
+                # Move cursor back down
+                + '\n' * self.last_action_line_count
+            )
             sys.stdout.flush()
 
 
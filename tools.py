@@ -15,6 +15,11 @@ except ImportError:
     XLIB_AVAILABLE = False
 
 
+def _result(stdout: str = "", stderr: str = "", exit_code: int = 0) -> dict:
+    """Build the result dict returned by every tool"""
+    return {"stdout": stdout, "stderr": stderr, "exitCode": exit_code}
+
+
 @dataclass
 class ExitException(Exception):
     """Exception to signal agent should exit"""
@@ -40,11 +45,7 @@ def click(x: float, y: float, button: int = 1, clicks: int = 1) -> dict:
         clicks: Number of clicks (1=single, 2=double, etc.)
     """
     if not XLIB_AVAILABLE:
-        return {
-            "stdout": "",
-            "stderr": "Xlib not available",
-            "exitCode": -1
-        }
+        return _result(stderr="Xlib not available", exit_code=-1)
 
     try:
         display = Xlib.display.Display(os.environ.get('DISPLAY', ':0'))
@@ -72,17 +73,9 @@ def click(x: float, y: float, button: int = 1, clicks: int = 1) -> dict:
 
         display.close()
 
-        return {
-            "stdout": "",
-            "stderr": "",
-            "exitCode": 0
-        }
+        return _result()
     except Exception as e:
-        return {
-            "stdout": "",
-            "stderr": str(e),
-            "exitCode": -1
-        }
+        return _result(stderr=str(e), exit_code=-1)
 
 
 def move(x: float, y: float) -> dict:
@@ -93,11 +86,7 @@ def move(x: float, y: float) -> dict:
         y: Relative y coordinate (0-1 range)
     """
     if not XLIB_AVAILABLE:
-        return {
-            "stdout": "",
-            "stderr": "Xlib not available",
-            "exitCode": -1
-        }
+        return _result(stderr="Xlib not available", exit_code=-1)
 
     try:
         display = Xlib.display.Display(os.environ.get('DISPLAY', ':0'))
@@ -115,17 +104,9 @@ def move(x: float, y: float) -> dict:
         display.sync()
         display.close()
 
-        return {
-            "stdout": "",
-            "stderr": "",
-            "exitCode": 0
-        }
+        return _result()
     except Exception as e:
-        return {
-            "stdout": "",
-            "stderr": str(e),
-            "exitCode": -1
-        }
+        return _result(stderr=str(e), exit_code=-1)
 
 
 def scroll(amount: int) -> dict:
@@ -139,34 +120,18 @@ def scroll(amount: int) -> dict:
         # We want positive for down, so negate the amount
         pyautogui.scroll(-amount)
 
-        return {
-            "stdout": "",
-            "stderr": "",
-            "exitCode": 0
-        }
+        return _result()
     except Exception as e:
-        return {
-            "stdout": "",
-            "stderr": str(e),
-            "exitCode": -1
-        }
+        return _result(stderr=str(e), exit_code=-1)
 
 
 def type(text: str) -> dict:
     """Type text using pyautogui"""
     try:
         pyautogui.write(text, interval=0.01)
-        return {
-            "stdout": "",
-            "stderr": "",
-            "exitCode": 0
-        }
+        return _result()
     except Exception as e:
-        return {
-            "stdout": "",
-            "stderr": str(e),
-            "exitCode": -1
-        }
+        return _result(stderr=str(e), exit_code=-1)
 
 
 def hotkey(keys: str) -> dict:
@@ -191,17 +156,9 @@ def hotkey(keys: str) -> dict:
         # Execute the hotkey
         pyautogui.hotkey(*mapped_keys)
 
-        return {
-            "stdout": "",
-            "stderr": "",
-            "exitCode": 0
-        }
+        return _result()
     except Exception as e:
-        return {
-            "stdout": "",
-            "stderr": str(e),
-            "exitCode": -1
-        }
+        return _result(stderr=str(e), exit_code=-1)
 
 
 def run_shell_command(cmd: str) -> dict:
@@ -213,11 +170,7 @@ def run_shell_command(cmd: str) -> dict:
         text=True
     )
 
-    return {
-        "stdout": result.stdout,
-        "stderr": result.stderr,
-        "exitCode": result.returncode
-    }
+    return _result(stdout=result.stdout, stderr=result.stderr, exit_code=result.returncode)
 
 
 def wait(n: float) -> dict:
@@ -228,11 +181,7 @@ def wait(n: float) -> dict:
     """
     time.sleep(n)
 
-    return {
-        "stdout": f"Waited for {n} seconds",
-        "stderr": "",
-        "exitCode": 0
-    }
+    return _result(stdout=f"Waited for {n} seconds")
 
 
 def focus_window(window_id: str) -> dict:
@@ -277,26 +226,16 @@ def focus_window(window_id: str) -> dict:
                         center_x = x + width // 2
                         center_y = y + height // 2
 
-                        # Get screen dimensions to convert to relative coordinates
+                        # Warp the pointer directly; center is already absolute
                         if XLIB_AVAILABLE:
                             display = Xlib.display.Display(os.environ.get('DISPLAY', ':0'))
-                            screen = display.screen()
-                            screen_width = screen.width_in_pixels
-                            screen_height = screen.height_in_pixels
+                            display.screen().root.warp_pointer(center_x, center_y)
+                            display.sync()
                             display.close()
 
-                            # Convert to relative coordinates and move mouse
-                            rel_x = center_x / screen_width
-                            rel_y = center_y / screen_height
-                            move(rel_x, rel_y)
-
                         break
 
-            return {
-                "stdout": f"Focused window: {window_id}",
-                "stderr": "",
-                "exitCode": 0
-            }
+            return _result(stdout=f"Focused window: {window_id}")
         else:
             # Try listing windows to provide helpful error
             list_result = subprocess.run(
@@ -305,23 +244,11 @@ def focus_window(window_id: str) -> dict:
                 text=True,
                 timeout=2
             )
-            return {
-                "stdout": "",
-                "stderr": f"Could not find window with ID '{window_id}'. Available windows:\n{list_result.stdout}",
-                "exitCode": -1
-            }
+            return _result(stderr=f"Could not find window with ID '{window_id}'. Available windows:\n{list_result.stdout}", exit_code=-1)
     except FileNotFoundError:
-        return {
-            "stdout": "",
-            "stderr": "wmctrl not installed. Install with: sudo apt-get install wmctrl",
-            "exitCode": -1
-        }
+        return _result(stderr="wmctrl not installed. Install with: sudo apt-get install wmctrl", exit_code=-1)
     except Exception as e:
-        return {
-            "stdout": "",
-            "stderr": str(e),
-            "exitCode": -1
-        }
+        return _result(stderr=str(e), exit_code=-1)
 
 
 def exit(summary: str = None, message: str = None, exit_code: int = 0) -> None:
@@ -1,4 +1,4 @@
-import React, { useState, useEffect, useRef } from 'react';
+import React, { useState, useEffect, useRef, useMemo } from 'react';
 import './App.css';
 
 interface LLMCall {
@@ -6,6 +6,7 @@ interface LLMCall {
   agentId: string;
   agentType: string;
   timestamp: number;
+  timeLabel: string;
   messages?: any[];
   model?: string;
   reasoning?: string;
@@ -18,6 +19,9 @@ interface TaskSubmission {
   task: string;
 }
 
+// Most LLM calls kept in the list; older ones are discarded
+const MAX_LLM_CALLS = 200;
+
 function App() {
   const [task, setTask] = useState('');
   const [llmCalls, setLlmCalls] = useState<LLMCall[]>([]);
@@ -26,6 +30,23 @@ function App() {
   const [connected, setConnected] = useState(false);
   const [isSubmitting, setIsSubmitting] = useState(false);
   const llmCallsRef = useRef<Map<string, LLMCall>>(new Map());
+  // Most recent call and currently running call of each agent, by call id
+  const latestCallIdsRef = useRef<Map<string, string>>(new Map());
+  const runningCallIdsRef = useRef<Map<string, string>>(new Map());
+  const renderFrameRef = useRef<number | null>(null);
+
+  const getCall = (id: string | undefined) =>
+    id !== undefined ? llmCallsRef.current.get(id) : undefined;
+
+  // Streamed chunks arrive many times per frame; publish the call list to
+  // React at most once per animation frame
+  const scheduleRender = () => {
+    if (renderFrameRef.current !== null) return;
+    renderFrameRef.current = requestAnimationFrame(() => {
+      renderFrameRef.current = null;
+      setLlmCalls(Array.from(llmCallsRef.current.values()));
+    });
+  };
 
   useEffect(() => {
     // Connect to WebSocket
@@ -47,13 +68,21 @@ function App() {
 
     websocket.onmessage = (event) => {
       const message = JSON.parse(event.data);
-      handleWebSocketMessage(message);
+      // The server sends updates queued together as one batch frame
+      if (message.type === 'batch') {
+        message.items.forEach(handleWebSocketMessage);
+      } else {
+        handleWebSocketMessage(message);
+      }
     };
 
     setWs(websocket);
 
     return () => {
       websocket.close();
+      if (renderFrameRef.current !== null) {
+        cancelAnimationFrame(renderFrameRef.current);
+      }
     };
   }, []);
 
@@ -62,11 +91,14 @@ function App() {
 
     switch (type) {
       case 'llm_call_start':
+        const now = Date.now();
         const newCall: LLMCall = {
-          id: `${agent_id}-${Date.now()}`,
+          id: `${agent_id}-${now}`,
           agentId: agent_id,
           agentType: agent_type,
-          timestamp: Date.now(),
+          timestamp: now,
+          // Formatted once here rather than on every render of the list
+          timeLabel: new Date(now).toLocaleTimeString(),
           messages: data.messages,
           model: data.model,
           reasoning: '',
@@ -74,70 +106,70 @@ function App() {
           status: 'running'
         };
         llmCallsRef.current.set(newCall.id, newCall);
-        setLlmCalls(Array.from(llmCallsRef.current.values()));
+        // Drop the oldest calls (Map keeps insertion order) so long sessions
+        // don't grow the list and its render cost without bound
+        while (llmCallsRef.current.size > MAX_LLM_CALLS) {
+          const oldestId = llmCallsRef.current.keys().next().value as string;
+          llmCallsRef.current.delete(oldestId);
+        }
+        latestCallIdsRef.current.set(agent_id, newCall.id);
+        runningCallIdsRef.current.set(agent_id, newCall.id);
+        scheduleRender();
         break;
 
       case 'llm_reasoning_chunk':
-        const latestCallForReasoning = Array.from(llmCallsRef.current.values())
-          .filter(c => c.agentId === agent_id && c.status === 'running')
-          .sort((a, b) => b.timestamp - a.timestamp)[0];
-
-        if (latestCallForReasoning) {
-          latestCallForReasoning.reasoning = (latestCallForReasoning.reasoning || '') + data.content;
-          llmCallsRef.current.set(latestCallForReasoning.id, latestCallForReasoning);
-          setLlmCalls(Array.from(llmCallsRef.current.values()));
+        const runningCallForReasoning = getCall(runningCallIdsRef.current.get(agent_id));
+
+        if (runningCallForReasoning) {
+          runningCallForReasoning.reasoning = (runningCallForReasoning.reasoning || '') + data.content;
+          scheduleRender();
         }
         break;
 
       case 'llm_content_chunk':
-        const latestCallForContent = Array.from(llmCallsRef.current.values())
-          .filter(c => c.agentId === agent_id && c.status === 'running')
-          .sort((a, b) => b.timestamp - a.timestamp)[0];
-
-        if (latestCallForContent) {
-          latestCallForContent.response = (latestCallForContent.response || '') + data.content;
-          llmCallsRef.current.set(latestCallForContent.id, latestCallForContent);
-          setLlmCalls(Array.from(llmCallsRef.current.values()));
+        const runningCallForContent = getCall(runningCallIdsRef.current.get(agent_id));
+
+        if (runningCallForContent) {
+          runningCallForContent.response = (runningCallForContent.response || '') + data.content;
+          scheduleRender();
         }
         break;
 
       case 'llm_call_end':
-        const latestCallForEnd = Array.from(llmCallsRef.current.values())
-          .filter(c => c.agentId === agent_id && c.status === 'running')
-          .sort((a, b) => b.timestamp - a.timestamp)[0];
+        const runningCallForEnd = getCall(runningCallIdsRef.current.get(agent_id));
 
-        if (latestCallForEnd) {
-          latestCallForEnd.status = 'completed';
+        if (runningCallForEnd) {
+          runningCallForEnd.status = 'completed';
+          runningCallIdsRef.current.delete(agent_id);
           // Update with final response and reasoning if provided (for non-streaming mode)
-          if (data.response && !latestCallForEnd.response) {
-            latestCallForEnd.response = data.response;
+          if (data.response && !runningCallForEnd.response) {
+            runningCallForEnd.response = data.response;
           }
-          if (data.reasoning && !latestCallForEnd.reasoning) {
-            latestCallForEnd.reasoning = data.reasoning;
+          if (data.reasoning && !runningCallForEnd.reasoning) {
+            runningCallForEnd.reasoning = data.reasoning;
           }
-          llmCallsRef.current.set(latestCallForEnd.id, latestCallForEnd);
-          setLlmCalls(Array.from(llmCallsRef.current.values()));
+          scheduleRender();
         }
         break;
 
       case 'screenshot':
-        const latestCallForScreenshot = Array.from(llmCallsRef.current.values())
-          .filter(c => c.agentId === agent_id)
-          .sort((a, b) => b.timestamp - a.timestamp)[0];
+        const latestCallForScreenshot = getCall(latestCallIdsRef.current.get(agent_id));
 
         if (latestCallForScreenshot) {
           latestCallForScreenshot.screenshot = data.screenshot;
-          llmCallsRef.current.set(latestCallForScreenshot.id, latestCallForScreenshot);
-          setLlmCalls(Array.from(llmCallsRef.current.values()));
+          scheduleRender();
         }
         break;
     }
   };
 
+  // Trimmed once per render for both the submit guard and the button state
+  const hasTask = task.trim() !== '';
+
   const handleSubmit = async (e: React.FormEvent) => {
     e.preventDefault();
 
-    if (!task.trim() || isSubmitting) return;
+    if (!hasTask || isSubmitting) return;
 
     setIsSubmitting(true);
 
@@ -164,10 +196,26 @@ function App() {
     }
   };
 
+  // One click handler for the whole list instead of a closure per call item
+  const handleCallListClick = (e: React.MouseEvent<HTMLDivElement>) => {
+    const item = (e.target as HTMLElement).closest<HTMLElement>('[data-call-id]');
+    if (item?.dataset.callId) {
+      setSelectedCall(item.dataset.callId);
+    }
+  };
+
   const selectedCallData = selectedCall
     ? llmCallsRef.current.get(selectedCall)
     : null;
 
+  // Messages are fixed once a call starts, so only re-serialize them when a
+  // different call is selected rather than on every streamed chunk
+  const selectedMessages = selectedCallData?.messages;
+  const selectedMessagesJson = useMemo(
+    () => (selectedMessages ? JSON.stringify(selectedMessages, null, 2) : ''),
+    [selectedMessages]
+  );
+
   return (
     <div className="App">
       <header className="App-header">
@@ -187,7 +235,7 @@ function App() {
               rows={4}
               disabled={!connected}
             />
-            <button type="submit" disabled={!connected || !task.trim() || isSubmitting}>
+            <button type="submit" disabled={!connected || !hasTask || isSubmitting}>
               {isSubmitting ? 'Submitting...' : 'Submit Task'}
             </button>
           </form>
@@ -196,18 +244,16 @@ function App() {
         <div className="content-section">
           <div className="llm-calls-list">
             <h2>LLM Calls</h2>
-            <div className="calls-container">
+            <div className="calls-container" onClick={handleCallListClick}>
               {llmCalls.map((call) => (
                 <div
                   key={call.id}
                   className={`call-item ${selectedCall === call.id ? 'selected' : ''} ${call.status}`}
-                  onClick={() => setSelectedCall(call.id)}
+                  data-call-id={call.id}
                 >
                   <div className="call-header">
                     <span className="agent-type">{call.agentType}</span>
-                    <span className="timestamp">
-                      {new Date(call.timestamp).toLocaleTimeString()}
-                    </span>
+                    <span className="timestamp">{call.timeLabel}</span>
                   </div>
                   <div className="call-model">{call.model}</div>
                   <div className="call-status">{call.status}</div>
@@ -257,7 +303,7 @@ function App() {
                   <div className="messages-section">
                     <h3>Messages</h3>
                     <pre className="messages-content">
-                      {JSON.stringify(selectedCallData.messages, null, 2)}
+                      {selectedMessagesJson}
                     </pre>
                   </div>
                 )}
@@ -1,11 +1,43 @@
 """Utility functions for the multi-agent system"""
 from typing import List, Dict, Any
 from anthropic import Anthropic
+from openai import OpenAI
+from functools import lru_cache
+from io import BytesIO
+from PIL import Image
+import asyncio
+import base64
 import os
 import json
+import secrets
+import shutil
+import subprocess
+import tempfile
+import time
 from datetime import datetime
 
 
+@lru_cache(maxsize=None)
+def get_llm_client(api_provider: str, api_key: str, base_url: str = None):
+    """
+    Return a shared API client for the given provider and credentials
+
+    Agents with the same credentials share one client, and with it one
+    HTTP connection pool, instead of each opening its own connections.
+
+    Args:
+        api_provider: "anthropic" or "openai" (any OpenAI-compatible API)
+        api_key: API key for the provider
+        base_url: API base URL (OpenAI-compatible providers only)
+
+    Returns:
+        An Anthropic or OpenAI client
+    """
+    if api_provider == "anthropic":
+        return Anthropic(api_key=api_key)
+    return OpenAI(api_key=api_key, base_url=base_url)
+
+
 def compact_context(
     content: List[Dict[str, Any]],
     task: str,
@@ -46,14 +78,15 @@ def compact_context(
         result = str(content[-5:])  # Return last 5 items
         return result
 
-    # Create Anthropic client (only Anthropic supported for now)
-    client = Anthropic(api_key=api_key)
+    # Reuse Anthropic client (only Anthropic supported for now)
+    client = get_llm_client("anthropic", api_key)
 
     # Build compaction prompt
+    content_text = str(content)
     prompt = f"""Task: {task}
 
 Context to compact:
-{content}
+{content_text}
 
 Guidelines:
 - If there is a history of previous actions and results, keep only the most recent ones that are relevant
@@ -115,13 +148,17 @@ Guidelines:
                     }
                 })
 
+    word_counts = {
+        "original_word_count": count_words(content_text),
+        "compacted_word_count": count_words(compacted_text)
+    }
+
     # Log output to file
     _log_to_file({
         "event": "output",
         "purpose": "context_compaction",
         "response": compacted_text,
-        "original_word_count": count_words(str(content)),
-        "compacted_word_count": count_words(compacted_text)
+        **word_counts
     }, agent_id, agent_name)
 
     # Send LLM call end event
@@ -131,8 +168,7 @@ Guidelines:
             "data": {
                 "purpose": "context_compaction",
                 "response": compacted_text,
-                "original_word_count": count_words(str(content)),
-                "compacted_word_count": count_words(compacted_text)
+                **word_counts
             }
         })
 
@@ -140,10 +176,7 @@ Guidelines:
     if websocket_callback:
         websocket_callback({
             "type": "compaction_end",
-            "data": {
-                "original_word_count": count_words(str(content)),
-                "compacted_word_count": count_words(compacted_text)
-            }
+            "data": word_counts
         })
 
     return compacted_text
@@ -171,6 +204,11 @@ def count_words(text: str) -> int:
     return len(text.split())
 
 
+def truncate_text(text: str, limit: int = 100, suffix: str = "...") -> str:
+    """Truncate text to limit characters, appending suffix only when it was cut"""
+    return text if len(text) <= limit else text[:limit] + suffix
+
+
 def strip_json_code_blocks(text: str) -> str:
     """Strip markdown code blocks from JSON response, allowing text before the code block"""
     text = text.strip()
@@ -187,9 +225,172 @@ def strip_json_code_blocks(text: str) -> str:
     return text
 
 
+_json_decoder = json.JSONDecoder()
+
+
+def parse_json_response(text: str) -> Dict[str, Any]:
+    """
+    Parse the JSON object in an LLM response
+
+    Strips markdown code blocks, then decodes the leading JSON value in a
+    single pass; any text the model adds after the JSON is ignored.
+
+    Raises:
+        json.JSONDecodeError: If the response does not start with a JSON object
+    """
+    text = strip_json_code_blocks(text)
+    data = _json_decoder.raw_decode(text)[0]
+    if not isinstance(data, dict):
+        raise json.JSONDecodeError("Expecting JSON object", text, 0)
+    return data
+
+
+# Capture temp files go to RAM-backed /dev/shm when available (default temp dir otherwise)
+SCREENSHOT_TMP_DIR = "/dev/shm" if os.access("/dev/shm", os.W_OK) else None
+
+# Full-screen capture commands in order of preference; the output path is appended
+SCREENSHOT_COMMANDS = (
+    ("scrot",),
+    ("import", "-window", "root"),
+)
+
+
+@lru_cache(maxsize=1)
+def _find_screenshot_command() -> tuple:
+    """Return the first installed screenshot command, resolved once per process"""
+    for command in SCREENSHOT_COMMANDS:
+        executable = shutil.which(command[0])
+        if executable:
+            return (executable,) + command[1:]
+    raise RuntimeError("No screenshot tool found; install scrot or ImageMagick")
+
+
+def _screenshot_temp_path() -> str:
+    """Reserve a temp file path for the screenshot tool to create"""
+    # Create temp file and close it immediately so the tool can write to it
+    temp_fd, temp_path = tempfile.mkstemp(suffix='.png', dir=SCREENSHOT_TMP_DIR)
+    os.close(temp_fd)  # Close the file descriptor immediately
+
+    # Remove the empty file that mkstemp created
+    if os.path.exists(temp_path):
+        os.unlink(temp_path)
+    return temp_path
+
+
+def _screenshot_env(default_display: str) -> Dict[str, str]:
+    """Environment for the screenshot tool (ensure DISPLAY is set)"""
+    env = os.environ.copy()
+    if 'DISPLAY' not in env:
+        env['DISPLAY'] = default_display
+    return env
+
+
+def _load_screenshot(temp_path: str, tool: str, returncode: int, stdout: bytes, stderr: bytes) -> str:
+    """Check the capture result and return the screenshot as a JPEG data URL"""
+    if returncode != 0:
+        raise RuntimeError(f"{tool} failed with code {returncode}: stdout={stdout.decode()}, stderr={stderr.decode()}")
+
+    if not os.path.exists(temp_path) or os.path.getsize(temp_path) == 0:
+        raise RuntimeError(f"{tool} did not create screenshot file at {temp_path}. Return code: {returncode}, stdout={stdout.decode()}, stderr={stderr.decode()}")
+
+    # Load and convert to JPEG
+    screenshot = Image.open(temp_path)
+    buffer = BytesIO()
+    screenshot.save(buffer, format="JPEG", quality=75)
+    # Encode straight from the buffer's memory instead of reading a copy
+    img_base64 = base64.b64encode(buffer.getbuffer()).decode('ascii')
+    return f"data:image/jpeg;base64,{img_base64}"
+
+
+def capture_screenshot_base64(default_display: str = ':0') -> str:
+    """
+    Capture the entire screen and return it as a base64-encoded JPEG
+
+    Uses scrot, or ImageMagick's import when scrot is not installed.
+
+    Args:
+        default_display: X display to capture when DISPLAY is not set
+
+    Returns:
+        Data URL of the JPEG screenshot
+    """
+    command = _find_screenshot_command()
+    temp_path = _screenshot_temp_path()
+
+    try:
+        result = subprocess.run(
+            [*command, temp_path],
+            capture_output=True,
+            timeout=2,
+            env=_screenshot_env(default_display)
+        )
+        return _load_screenshot(temp_path, os.path.basename(command[0]), result.returncode, result.stdout, result.stderr)
+    finally:
+        # Clean up temp file
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+
+
+async def capture_screenshot_base64_async(default_display: str = ':0') -> str:
+    """
+    Async version of capture_screenshot_base64 that does not block the event loop
+
+    Args:
+        default_display: X display to capture when DISPLAY is not set
+
+    Returns:
+        Data URL of the JPEG screenshot
+    """
+    command = _find_screenshot_command()
+    temp_path = _screenshot_temp_path()
+
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *command, temp_path,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=_screenshot_env(default_display)
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(proc.communicate(), timeout=2)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise
+
+        # Decoding and re-encoding the image is CPU-bound; keep it off the loop
+        return await asyncio.get_running_loop().run_in_executor(
+            None, _load_screenshot, temp_path, os.path.basename(command[0]), proc.returncode, stdout, stderr
+        )
+    finally:
+        # Clean up temp file
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+
+
+SCREENSHOTS_DIR = "screenshots"
+
+# Last whole second used in a screenshot name and its formatted form
+_timestamp_cache = (0, "")
+# Screenshot subdirectories already created by this process
+_screenshot_dirs = set()
+
+
+def _screenshot_timestamp() -> str:
+    """Millisecond timestamp for screenshot names, formatting each second only once"""
+    global _timestamp_cache
+    now = time.time()
+    second = int(now)
+    cached_second, formatted = _timestamp_cache
+    if second != cached_second:
+        formatted = time.strftime("%Y%m%d_%H%M%S", time.localtime(second))
+        _timestamp_cache = (second, formatted)
+    return f"{formatted}_{int((now - second) * 1000):03d}"
+
+
 def save_screenshot(screenshot_data: str, prefix: str = "screenshot") -> str:
     """
-    Save a base64-encoded screenshot to the screenshots directory
+    Save a base64-encoded screenshot under screenshots/<YYYYMMDD>/
 
     Args:
         screenshot_data: Base64-encoded image data (with or without data URL prefix)
@@ -198,17 +399,16 @@ def save_screenshot(screenshot_data: str, prefix: str = "screenshot") -> str:
     Returns:
         Path to the saved screenshot file
     """
-    import base64
-    import os
-    from datetime import datetime
-
-    # Create screenshots directory if it doesn't exist
-    screenshots_dir = "screenshots"
-    os.makedirs(screenshots_dir, exist_ok=True)
-
-    # Generate timestamp-based filename
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]  # millisecond precision
-    filename = f"{prefix}_{timestamp}.png"
+    # Generate timestamp-based filename; saves run concurrently in executor
+    # threads, so a random suffix keeps same-millisecond names unique
+    timestamp = _screenshot_timestamp()  # millisecond precision
+
+    # One subdirectory per day keeps directory sizes bounded
+    screenshots_dir = os.path.join(SCREENSHOTS_DIR, timestamp[:8])
+    if screenshots_dir not in _screenshot_dirs:
+        os.makedirs(screenshots_dir, exist_ok=True)
+        _screenshot_dirs.add(screenshots_dir)
+    filename = f"{prefix}_{timestamp}_{secrets.token_hex(4)}.png"
     filepath = os.path.join(screenshots_dir, filename)
 
     # Extract base64 data if it includes the data URL prefix
@@ -231,3 +431,28 @@ def save_screenshot(screenshot_data: str, prefix: str = "screenshot") -> str:
     except Exception as e:
         print(f"Warning: Failed to save screenshot: {e}")
         return None
+
+
+def _report_screenshot_save(future: asyncio.Future):
+    """Print the error of a background screenshot save, if it failed"""
+    if not future.cancelled() and future.exception() is not None:
+        print(f"Warning: Failed to save screenshot: {future.exception()}")
+
+
+def save_screenshot_in_background(screenshot_data: str, prefix: str = "screenshot") -> asyncio.Future:
+    """
+    Save a screenshot in an executor thread without blocking the event loop
+
+    Errors are reported when the save finishes instead of being dropped with
+    the future.
+
+    Args:
+        screenshot_data: Base64-encoded image data (with or without data URL prefix)
+        prefix: Prefix for the screenshot filename
+
+    Returns:
+        Future resolving to the path of the saved screenshot file
+    """
+    future = asyncio.get_running_loop().run_in_executor(None, save_screenshot, screenshot_data, prefix)
+    future.add_done_callback(_report_screenshot_save)
+    return future
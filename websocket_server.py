@@ -1,10 +1,51 @@
 import asyncio
 import json
-from typing import Set, Dict, Any, List
+from typing import Set, Dict, Any, List, Optional
 from aiohttp import web
 import aiohttp
 from collections import deque
 
+# Use orjson for encoding and decoding messages when it is installed
+try:
+    import orjson
+
+    def json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    json_loads = orjson.loads
+except ImportError:
+    json_dumps = json.dumps
+    json_loads = json.loads
+
+# Polling responses at least this large are compressed for clients that accept it
+COMPRESS_MIN_BYTES = 1024
+
+# Streaming events whose content can be merged into a single frame
+CHUNK_EVENT_TYPES = ("llm_content_chunk", "llm_reasoning_chunk")
+
+
+def coalesce_chunks(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Merge consecutive content chunks of the same type from the same agent"""
+    coalesced: List[Dict[str, Any]] = []
+    for message in messages:
+        previous = coalesced[-1] if coalesced else None
+        if (
+            previous is not None
+            and message.get("type") in CHUNK_EVENT_TYPES
+            and message.get("type") == previous.get("type")
+            and message.get("agent_id") == previous.get("agent_id")
+        ):
+            coalesced[-1] = {
+                **previous,
+                "data": {
+                    **previous.get("data", {}),
+                    "content": previous.get("data", {}).get("content", "") + message.get("data", {}).get("content", "")
+                }
+            }
+        else:
+            coalesced.append(message)
+    return coalesced
+
 
 class WebSocketServer:
     """WebSocket server for real-time communication with frontend"""
@@ -20,6 +61,9 @@ class WebSocketServer:
         self.message_id_counter = 0
         # Event listeners for local terminal UI
         self.event_listeners: List = []
+        # Agent updates waiting for the single writer task, in arrival order
+        self._update_queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
         self.setup_routes()
 
     def setup_routes(self):
@@ -65,14 +109,15 @@ class WebSocketServer:
         try:
             async for msg in ws:
                 if msg.type == aiohttp.WSMsgType.TEXT:
+                    # Handle incoming messages if needed; only a malformed
+                    # message is skipped here, anything else ends the
+                    # connection through the handler below
                     try:
-                        # Handle incoming messages if needed
-                        data = json.loads(msg.data)
-                        print(f"Received: {data}")
-                    except Exception as e:
-                        print(f"ERROR: Failed to process WebSocket message: {e}")
-                        import traceback
-                        traceback.print_exc()
+                        data = json_loads(msg.data)
+                    except ValueError as e:
+                        print(f"ERROR: Invalid WebSocket message: {e}")
+                        continue
+                    print(f"Received: {data}")
                 elif msg.type == aiohttp.WSMsgType.ERROR:
                     print(f"ERROR: WebSocket error: {ws.exception()}")
         except Exception as e:
@@ -80,7 +125,8 @@ class WebSocketServer:
             import traceback
             traceback.print_exc()
         finally:
-            self.clients.remove(ws)
+            # A failed broadcast may already have dropped this client
+            self.clients.discard(ws)
             # print(f"Client disconnected. Total clients: {len(self.clients)}")
 
         return ws
@@ -130,19 +176,25 @@ class WebSocketServer:
                 if msg_data['id'] > last_id:
                     new_messages.append(msg_data)
 
-            return web.json_response({
+            response = web.json_response({
                 'success': True,
                 'messages': new_messages,
                 'latest_id': self.message_id_counter
-            })
+            }, dumps=json_dumps)
+
+            # A catch-up poll can return hundreds of buffered messages
+            if len(response.body) >= COMPRESS_MIN_BYTES:
+                response.enable_compression()
+
+            return response
         except Exception as e:
             print(f"ERROR: Polling handler failed: {e}")
             import traceback
             traceback.print_exc()
             return web.json_response({'error': str(e)}, status=500)
 
-    async def broadcast(self, message: Dict[str, Any]):
-        """Broadcast message to all connected clients"""
+    def _record(self, message: Dict[str, Any]):
+        """Buffer a message for polling and pass it to the event listeners"""
         # Assign message ID and add to buffer for polling
         self.message_id_counter += 1
         message_with_id = {
@@ -160,35 +212,90 @@ class WebSocketServer:
                 import traceback
                 traceback.print_exc()
 
+    async def _send_to_clients(self, payload: Dict[str, Any]):
+        """Send one JSON frame to all connected clients"""
         if not self.clients:
             return
 
         # Convert message to JSON
-        json_message = json.dumps(message)
-
-        # Send to all clients
-        disconnected_clients = set()
-        for ws in self.clients:
-            try:
-                await ws.send_str(json_message)
-            except Exception as e:
-                print(f"ERROR: Failed to send message to client: {e}")
-                import traceback
-                traceback.print_exc()
+        json_message = json_dumps(payload)
+
+        # Send to all clients concurrently so one slow client doesn't hold up the rest
+        disconnected_clients = {ws for ws in self.clients if ws.closed}
+        open_clients = [ws for ws in self.clients if not ws.closed]
+        results = await asyncio.gather(
+            *(ws.send_str(json_message) for ws in open_clients),
+            return_exceptions=True
+        )
+        for ws, result in zip(open_clients, results):
+            if isinstance(result, Exception):
+                # Keep this to one line: it can fire for every streamed chunk
+                print(f"ERROR: Failed to send message to client: {result}")
                 disconnected_clients.add(ws)
 
         # Remove disconnected clients
         self.clients -= disconnected_clients
 
+    async def broadcast(self, message: Dict[str, Any]):
+        """Broadcast message to all connected clients"""
+        self._record(message)
+        await self._send_to_clients(message)
+
+    async def broadcast_batch(self, messages: List[Dict[str, Any]]):
+        """Broadcast several messages to WebSocket clients as a single frame
+
+        More than one message is sent as {"type": "batch", "items": [...]};
+        polling clients and event listeners still see each message separately.
+        """
+        if len(messages) == 1:
+            await self.broadcast(messages[0])
+            return
+
+        for message in messages:
+            self._record(message)
+        await self._send_to_clients({"type": "batch", "items": messages})
+
+    async def _write_updates(self, queue: asyncio.Queue):
+        """Drain queued agent updates, sending everything queued so far as one batch"""
+        while True:
+            batch = [await queue.get()]
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+            try:
+                await self.broadcast_batch(coalesce_chunks(batch))
+            except Exception as e:
+                print(f"ERROR: Failed to broadcast updates: {e}")
+
+    def _queue_update(self, message: Dict[str, Any]):
+        """Queue an agent update for the writer task (runs on the event loop)"""
+        if self._writer_task is None or self._writer_task.done():
+            self._update_queue = asyncio.Queue()
+            self._writer_task = asyncio.get_running_loop().create_task(
+                self._write_updates(self._update_queue)
+            )
+        self._update_queue.put_nowait(message)
+
     def create_websocket_callback(self):
         """Create a callback function for agents to send updates"""
+        # Look up the server's event loop once instead of on every update
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = asyncio.get_event_loop()
+
         def callback(message: Dict[str, Any]):
-            """Synchronous callback that schedules async broadcast"""
+            """Synchronous callback that queues the update for broadcast"""
             try:
-                # Get the running event loop
-                loop = asyncio.get_event_loop()
-                # Create task to broadcast in the event loop
-                asyncio.run_coroutine_threadsafe(self.broadcast(message), loop)
+                # Updates pile up in the queue while an agent blocks the loop
+                # and go out as one frame once the writer task runs
+                try:
+                    on_loop = asyncio.get_running_loop() is loop
+                except RuntimeError:
+                    on_loop = False
+                if on_loop:
+                    self._queue_update(message)
+                else:
+                    loop.call_soon_threadsafe(self._queue_update, message)
             except Exception as e:
                 print(f"ERROR: Failed to schedule broadcast: {e}")
                 import traceback